@@ -0,0 +1,129 @@
+import math
+
+import numpy as np
+
+from calculator import VehicleCostCalculator
+
+
+RATE_STEPS_PER_UNIT = 10000  # Grid of annual rates in steps of 0.01%
+
+
+class AnnuityFactorTable:
+    """
+    Precomputed loan annuity factors for a grid of annual rates and terms in months.
+
+    For every annual rate on a 0.01% grid and every term up to max_months, the table holds
+    the numerator r * (1 + r) ** n and the denominator (1 + r) ** n - 1 of the monthly
+    payment formula (1 and n for a zero rate). Multiplying a principal by the numerator and
+    dividing by the denominator gives exactly the result of
+    VehicleCostCalculator.calculate_monthly_loan_payment without computing the power.
+
+    The table is stored as a .npy file and memory-mapped, so many worker processes
+    share a single copy in the OS page cache.
+    """
+    def __init__(self, factors):
+        """
+        Initialize the AnnuityFactorTable class from an array of factors.
+
+        Args:
+            factors (numpy.ndarray): Array of shape (2, rates, months) holding numerators and
+                                     denominators, as created by build().
+        """
+        self.factors = factors
+        self.rate_count = factors.shape[1]
+        self.max_months = factors.shape[2]
+        # Flat views for cheap lookups: numerators first, then denominators
+        self._flat_factors = factors.reshape(-1)
+        self._plane_size = self.rate_count * self.max_months
+        self._scalar_factors = memoryview(self._flat_factors).cast('B').cast('d')
+        # Per-process memo of on-grid (rate, years) lookups, bounded by the size of the grid
+        self._lookups = {}
+
+    @classmethod
+    def build(cls, file_path, max_rate=0.30, max_months=96):
+        """
+        Compute the table, write it to disk and return it memory-mapped.
+
+        Args:
+            file_path (str): The .npy file to write.
+            max_rate (float, optional): The highest annual rate on the grid. Defaults to 0.30 (30%).
+            max_months (int, optional): The longest term in months. Defaults to 96 (8 years).
+
+        Returns:
+            AnnuityFactorTable: The table, memory-mapped from file_path.
+        """
+        annual_rates = np.arange(int(round(max_rate * RATE_STEPS_PER_UNIT)) + 1) / RATE_STEPS_PER_UNIT
+        years = np.arange(1, max_months + 1, dtype=np.float64) / 12
+        numerators, denominators = VehicleCostCalculator().calculate_payment_factors(
+            annual_rates[:, np.newaxis], years[np.newaxis, :]
+        )
+        np.save(file_path, np.stack([numerators, denominators]))
+        return cls.load(file_path)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Memory-map a table previously written by build().
+
+        Args:
+            file_path (str): The .npy file to read.
+
+        Returns:
+            AnnuityFactorTable: The memory-mapped table.
+        """
+        return cls(np.load(file_path, mmap_mode='r'))
+
+    def get_factors(self, annual_rate, years):
+        """
+        Look up the payment numerator and denominator of one loan.
+
+        Args:
+            annual_rate (float): The annual interest rate.
+            years (float): The loan term in years.
+
+        Returns:
+            tuple: Contains the numerator and denominator, or None if the rate or term is not
+                   on the grid and the closed form has to be used instead.
+        """
+        key = (annual_rate, years)
+        factors = self._lookups.get(key)
+        if factors is None:
+            factors = self._find_factors(annual_rate, years)
+            if factors is not None:
+                self._lookups[key] = factors
+        return factors
+
+    def _find_factors(self, annual_rate, years):
+        if not math.isfinite(annual_rate) or not math.isfinite(years):
+            return None
+        rate_index = round(annual_rate * RATE_STEPS_PER_UNIT)
+        months = years * 12
+        if (rate_index / RATE_STEPS_PER_UNIT != annual_rate or not 0 <= rate_index < self.rate_count
+                or months != int(months) or not 1 <= months <= self.max_months):
+            return None
+        index = rate_index * self.max_months + int(months) - 1
+        return self._scalar_factors[index], self._scalar_factors[self._plane_size + index]
+
+    def get_factor_arrays(self, annual_rates, years):
+        """
+        Look up the payment numerators and denominators of many loans.
+
+        Args:
+            annual_rates (numpy.ndarray): The annual interest rates, as float64.
+            years (numpy.ndarray): The loan terms in years, as float64 and the same shape.
+
+        Returns:
+            tuple: Contains a boolean mask of the loans on the grid, and arrays of numerators and
+                   denominators shaped like the inputs. Values outside the mask are meaningless.
+        """
+        rate_indexes = np.rint(annual_rates * RATE_STEPS_PER_UNIT)
+        months = years * 12
+        on_grid = ((rate_indexes / RATE_STEPS_PER_UNIT == annual_rates)
+                   & (rate_indexes >= 0) & (rate_indexes < self.rate_count)
+                   & (months == np.floor(months)) & (months >= 1) & (months <= self.max_months))
+        # Gather with flat indexes for every loan, pointing off-grid loans at entry 0
+        indexes = rate_indexes * self.max_months + months - 1
+        indexes = np.where(on_grid, indexes, 0).astype(np.intp)
+        numerators = np.take(self._flat_factors, indexes)
+        denominators = np.take(self._flat_factors, indexes + self._plane_size)
+        return on_grid, numerators, denominators
@@ -0,0 +1,289 @@
+import argparse
+import asyncio
+import math
+
+import numpy as np
+from aiohttp import web
+
+from async_scraper import AsyncScraper
+from calculator import VehicleCostCalculator, scraper, gas_price_store, maintenance_index
+from comparison import compare_vehicles_async
+from gas_prices import GasPriceSnapshot, GAS_PRICES_URL
+from http_archive import ResponseArchive
+from instrumentation import metrics
+
+
+STRING_FIELDS = ['make', 'model', 'state', 'gas_grade']
+
+
+def to_number(value):
+    """
+    Convert a calculated value to something JSON can hold.
+
+    Args:
+        value (float): The value, possibly NaN, infinite or None.
+
+    Returns:
+        float: The value, or None if it is missing, NaN or infinite, which JSON cannot hold.
+    """
+    if value is None:
+        return None
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def parse_scenario(item):
+    """
+    Validate a vehicle scenario from a request and convert its numbers.
+
+    Args:
+        item (dict): The scenario, with the same keys as a batch_pricing row. The loan
+                     interest rate is an annual fraction (0.05 for 5%).
+
+    Returns:
+        dict: The scenario with numeric fields as floats.
+
+    Raises:
+        KeyError: If a required field is missing.
+        ValueError: If a number cannot be parsed or the loan term is not positive.
+    """
+    scenario = dict(item)
+    for field in ['mileage', 'purchase_price', 'loan_interest_rate', 'loan_term_years']:
+        scenario[field] = float(item[field])
+    scenario['down_payment_amount'] = float(item.get('down_payment_amount') or 0)
+    check_loan_term(scenario['loan_term_years'])
+    return scenario
+
+
+def check_loan_term(years):
+    """
+    Check that a loan term can be priced.
+
+    Args:
+        years (float): The loan term in years.
+
+    Raises:
+        ValueError: If the term is not a positive number.
+    """
+    if not years > 0:
+        raise ValueError(f"'loan_term_years' must be positive, got {years}")
+
+
+class CostService:
+    """
+    An HTTP JSON API over VehicleCostCalculator, for quoting frontends and load tests.
+
+    Every endpoint accepts either one JSON object or a JSON list of them and answers in
+    kind, so clients can batch many quotes into one request. All requests share the
+    calculator's scraper cache, gas price store and maintenance index, and one AsyncScraper
+    that joins concurrent fetches of the same page. A semaphore caps how many requests are
+    handled at once.
+    """
+    def __init__(self, max_concurrency=64, max_batch_size=10000, gas_prices_url=GAS_PRICES_URL):
+        """
+        Initialize the CostService class.
+
+        Args:
+            max_concurrency (int, optional): Maximum number of requests handled at once; later
+                                             requests wait for a slot. Defaults to 64.
+            max_batch_size (int, optional): Maximum number of items in one request. Defaults to 10000.
+            gas_prices_url (str, optional): The URL to scrape for gas prices.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_batch_size = max_batch_size
+        self.gas_prices_url = gas_prices_url
+        self.calculator = VehicleCostCalculator()
+        self.async_scraper = AsyncScraper(scraper)
+        self._limit = None
+
+    def create_app(self):
+        """
+        Build the aiohttp application serving the API.
+
+        Returns:
+            aiohttp.web.Application: The application.
+        """
+        app = web.Application(middlewares=[self.limit_requests])
+        app.add_routes([
+            web.get('/health', self.handle_health),
+            web.get('/metrics', self.handle_metrics),
+            web.post('/loan-payment', self.handle_loan_payment),
+            web.post('/gas-cost', self.handle_gas_cost),
+            web.post('/maintenance-cost', self.handle_maintenance_cost),
+            web.post('/compare', self.handle_compare),
+        ])
+        app.on_cleanup.append(self.close)
+        return app
+
+    async def close(self, app):
+        """
+        Close the shared aiohttp session of the scraper.
+        """
+        await self.async_scraper.close()
+
+    @web.middleware
+    async def limit_requests(self, request, handler):
+        """
+        Handle a request within the concurrency limit, timing it and turning invalid input into a 400.
+        """
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.max_concurrency)
+        async with self._limit:
+            with metrics.timer('api_request_seconds', {'handler': handler.__name__}):
+                try:
+                    return await handler(request)
+                except (KeyError, TypeError, ValueError) as e:
+                    metrics.increment('api_errors_total', labels={'handler': handler.__name__})
+                    return web.json_response({'error': f"{type(e).__name__}: {e}"}, status=400)
+
+    async def read_items(self, request):
+        """
+        Read the JSON body of a request as a list of items.
+
+        Args:
+            request (aiohttp.web.Request): The request.
+
+        Returns:
+            tuple: Contains the list of item dictionaries and whether the body was a batch.
+
+        Raises:
+            ValueError: If the body is not an object or a list of objects, or is too large a batch.
+            TypeError: If any of the STRING_FIELDS of an item is not a string.
+        """
+        body = await request.json()
+        is_batch = isinstance(body, list)
+        items = body if is_batch else [body]
+        if len(items) > self.max_batch_size:
+            raise ValueError(f"Batches are limited to {self.max_batch_size} items")
+        if not all(isinstance(item, dict) for item in items):
+            raise ValueError("Expected a JSON object or a list of JSON objects")
+        for item in items:
+            for field in STRING_FIELDS:
+                if field in item and not isinstance(item[field], str):
+                    raise TypeError(f"'{field}' must be a string")
+        return items, is_batch
+
+    def respond(self, results, is_batch):
+        """
+        Answer with the results of a batch, or the single result of a single item.
+        """
+        return web.json_response(results if is_batch else results[0])
+
+    async def get_snapshot(self):
+        """
+        Get the shared gas price snapshot, fetching it on a worker thread if it is stale.
+
+        Returns:
+            GasPriceSnapshot: The gas prices, or None if they could not be fetched.
+        """
+        return await asyncio.to_thread(gas_price_store.get_snapshot, self.gas_prices_url)
+
+    async def handle_health(self, request):
+        return web.json_response({'status': 'ok'})
+
+    async def handle_metrics(self, request):
+        return web.Response(text=metrics.to_prometheus(), content_type='text/plain')
+
+    async def handle_loan_payment(self, request):
+        """
+        Calculate monthly loan payments, all items of a batch in one vectorized pass.
+
+        Items need 'purchase_price', 'loan_interest_rate' and 'loan_term_years', and may
+        have a 'down_payment_amount'.
+        """
+        items, is_batch = await self.read_items(request)
+        principals = [float(item['purchase_price']) - float(item.get('down_payment_amount') or 0) for item in items]
+        rates = [float(item['loan_interest_rate']) for item in items]
+        terms = [float(item['loan_term_years']) for item in items]
+        for term in terms:
+            check_loan_term(term)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            payments = self.calculator.calculate_monthly_loan_payments(principals, rates, terms)
+        return self.respond([{'monthly_loan_payment': to_number(payment)} for payment in payments], is_batch)
+
+    async def handle_gas_cost(self, request):
+        """
+        Calculate monthly gas costs. Items need 'make', 'model', 'mileage', 'state' and 'gas_grade'.
+        """
+        items, is_batch = await self.read_items(request)
+        mileages = np.array([float(item['mileage']) for item in items], dtype=np.float64)
+        # Look each vehicle up once, however often it appears in the batch
+        vehicles = list({(item['make'], item['model']) for item in items})
+        snapshot, *vehicle_mpgs = await asyncio.gather(
+            self.get_snapshot(),
+            *(self.async_scraper.get_vehicle_mpg(make, model) for make, model in vehicles),
+        )
+        mpg_by_vehicle = dict(zip(vehicles, vehicle_mpgs))
+        gas_prices = [
+            snapshot.get_price(item['state'], item['gas_grade']) if snapshot is not None else None for item in items
+        ]
+        mpgs = [mpg_by_vehicle[(item['make'], item['model'])] for item in items]
+        mpgs = np.array([np.nan if mpg is None else mpg for mpg in mpgs], dtype=np.float64)
+        gas_prices = np.array([np.nan if price is None else price for price in gas_prices], dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            costs = self.calculator.calculate_gas_cost(mileages, mpgs, gas_prices)
+        return self.respond([{'monthly_gas_cost': to_number(cost)} for cost in costs], is_batch)
+
+    async def handle_maintenance_cost(self, request):
+        """
+        Calculate annual and monthly maintenance costs. Items need 'make', 'model' and 'mileage'.
+        """
+        items, is_batch = await self.read_items(request)
+        vehicles = [(item['make'], item['model'], float(item['mileage'])) for item in items]
+        await asyncio.gather(*(
+            maintenance_index.fetch_bucket_curves(self.async_scraper, make, model, mileage)
+            for make, model, mileage in set(vehicles)
+        ))
+        results = []
+        for make, model, mileage in vehicles:
+            annual_cost = maintenance_index.get_maintenance_costs(make, model, mileage, fetch=False)
+            results.append({
+                'annual_repair_maintenance_cost': to_number(annual_cost),
+                'monthly_repair_maintenance_cost': to_number(
+                    self.calculator.get_monthly_repair_maintenance_cost(annual_cost)
+                ),
+            })
+        return self.respond(results, is_batch)
+
+    async def handle_compare(self, request):
+        """
+        Rank vehicle scenarios by total monthly cost.
+
+        The body is a list of scenarios, each with the fields of a batch_pricing row. The
+        answer is the ranked list, as returned by comparison.rank_results.
+        """
+        items, is_batch = await self.read_items(request)
+        if not is_batch:
+            raise ValueError("Expected a list of scenarios to compare")
+        scenarios = [parse_scenario(item) for item in items]
+        results = await compare_vehicles_async(scenarios, self.async_scraper, self.gas_prices_url)
+        return web.json_response(results)
+
+
+def main(argv=None):
+    """
+    Serve the calculator as an HTTP JSON API.
+    """
+    parser = argparse.ArgumentParser(description="Serve vehicle cost calculations as an HTTP JSON API.")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=8080, help="Port to listen on")
+    parser.add_argument('--max-concurrency', type=int, default=64, help="Requests handled at once")
+    parser.add_argument('--max-batch-size', type=int, default=10000, help="Items allowed in one request")
+    parser.add_argument('--gas-snapshot', help="Gas price snapshot file to use instead of fetching current prices")
+    parser.add_argument('--replay', help="Response archive to replay web requests from, without network access")
+    parser.add_argument('--metrics', action='store_true', help="Record metrics, served at /metrics")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.enable()
+    if args.replay:
+        scraper.use_archive(ResponseArchive.load(args.replay))
+    if args.gas_snapshot:
+        gas_price_store.pin(GasPriceSnapshot.load(args.gas_snapshot))
+
+    service = CostService(args.max_concurrency, args.max_batch_size)
+    web.run_app(service.create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
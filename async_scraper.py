@@ -0,0 +1,194 @@
+import asyncio
+
+import aiohttp
+
+from instrumentation import metrics
+from scraper import Scraper, DEFAULT_HEADERS
+
+
+class AsyncScraper:
+    """
+    An asyncio counterpart to Scraper, sharing its cache, parser, retry settings and response archive.
+
+    All requests go through one aiohttp session, a semaphore caps how many are in flight,
+    and concurrent requests for the same URL share a single fetch.
+    """
+    def __init__(self, scraper=None, max_concurrency=8):
+        """
+        Initialize the AsyncScraper class.
+
+        Args:
+            scraper (Scraper, optional): The synchronous scraper whose cache, parser and backoff
+                                         settings are reused. Defaults to a new Scraper().
+            max_concurrency (int, optional): Maximum number of requests in flight. Defaults to 8.
+        """
+        self.scraper = scraper if scraper is not None else Scraper()
+        self.max_concurrency = max_concurrency
+        self.session = None
+        self._semaphore = None
+        self._in_flight = {}
+
+    def get_session(self):
+        """
+        Get the shared aiohttp session, creating it inside the running event loop on first use.
+
+        Returns:
+            aiohttp.ClientSession: The session used for every request.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency, limit_per_host=self.scraper.max_requests_per_host
+            )
+            self.session = aiohttp.ClientSession(headers=DEFAULT_HEADERS, connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    async def close(self):
+        """
+        Close the aiohttp session and its pooled connections.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def fetch_url(self, url, retries=3, timeout=10):
+        """
+        Fetches the content of the URL, joining any fetch of the same URL already in flight.
+
+        Args:
+            url (str): The URL to fetch.
+            retries (int, optional): Number of retries in case of failure. Defaults to 3.
+            timeout (int, optional): Timeout for the request in seconds. Defaults to 10.
+
+        Returns:
+            str: The HTML content of the URL, or None if failed.
+        """
+        task = self._in_flight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_url(url, retries, timeout))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_url(self, url, retries, timeout):
+        archive = self.scraper.archive
+        if archive is not None and archive.mode == 'replay':
+            return archive.get_text(url)
+        session = self.get_session()
+        for attempt in range(retries):
+            try:
+                async with self._semaphore:
+                    with metrics.timer('scraper_fetch_seconds', {'client': 'async'}):
+                        metrics.increment('scraper_requests_total', labels={'client': 'async'})
+                        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                            body = await response.read()
+                metrics.increment('scraper_bytes_fetched_total', len(body), {'client': 'async'})
+                if archive is not None:
+                    archive.record(url, response.status, response.reason, response.headers.get('Content-Type'), body)
+                response.raise_for_status()
+                return body.decode(response.get_encoding())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.increment('scraper_fetch_errors_total', labels={'client': 'async'})
+                print(f"Error fetching URL {url} on attempt {attempt + 1}/{retries}: {e}")
+                if attempt < retries - 1:
+                    metrics.increment('scraper_retries_total', labels={'client': 'async'})
+                    await asyncio.sleep(self.scraper.get_retry_delay(attempt))
+        return None
+
+    async def get_maintenance_costs(self, make, model, mileage):
+        """
+        Scrape the maintenance costs for a specific make and model.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            mileage (str): The mileage of the vehicle.
+
+        Returns:
+            float: The maintenance cost for the first year, or None if failed.
+        """
+        url = self.scraper.get_maintenance_costs_url(make, model, mileage)
+        cached = self.scraper.get_cached('maintenance', url)
+        if cached is not None:
+            return cached
+        curve = self.scraper.get_cached('maintenance_curve', url)
+        if curve is not None:
+            return self.scraper.get_first_year_cost(url, curve, make, model)
+        print(f"Fetching maintenance costs from URL: {url}")
+        return self.scraper.extract_maintenance_costs(url, await self.fetch_url(url), make, model)
+
+    async def get_maintenance_cost_curve(self, make, model, mileage):
+        """
+        Scrape the maintenance cost of every year of ownership for a specific make and model.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            mileage (str): The mileage of the vehicle.
+
+        Returns:
+            list: The annual maintenance cost of years 1, 2, ... as floats, with None for any
+                  missing year, or None if failed.
+        """
+        url = self.scraper.get_maintenance_costs_url(make, model, mileage)
+        cached = self.scraper.get_cached('maintenance_curve', url)
+        if cached is not None:
+            return cached
+        print(f"Fetching maintenance costs from URL: {url}")
+        return self.scraper.extract_maintenance_cost_curve(url, await self.fetch_url(url), make, model)
+
+    async def get_gas_prices(self, url):
+        """
+        Scrape gas prices for different states from the given URL.
+
+        Args:
+            url (str): The URL to scrape for gas prices.
+
+        Returns:
+            dict: A dictionary containing gas prices for different states, or None if failed.
+        """
+        cached = self.scraper.get_cached('gas_prices', url)
+        if cached is not None:
+            return cached
+        print(f"Fetching gas prices from URL: {url}")
+        return self.scraper.extract_gas_prices(url, await self.fetch_url(url))
+
+    async def get_vehicle_mpg(self, make, model):
+        """
+        Scrape the average MPG for a specific vehicle make and model.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+
+        Returns:
+            int: The average MPG for the vehicle, or None if failed.
+        """
+        url = self.scraper.get_vehicle_mpg_url(make, model)
+        cached = self.scraper.get_cached('mpg', url)
+        if cached is not None:
+            return cached
+        print(f"Fetching MPG from URL: {url}")
+        return self.scraper.extract_vehicle_mpg(url, await self.fetch_url(url), make, model)
+
+    async def get_vehicle_data(self, make, model, mileage):
+        """
+        Concurrently scrape the MPG and maintenance costs of a vehicle.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            mileage (str): The mileage of the vehicle.
+
+        Returns:
+            tuple: Contains the average MPG and the first-year maintenance cost.
+        """
+        return tuple(await asyncio.gather(
+            self.get_vehicle_mpg(make, model), self.get_maintenance_costs(make, model, mileage)
+        ))
@@ -0,0 +1,290 @@
+import argparse
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from gas_prices import GasPriceSnapshot, GAS_PRICES_URL
+from http_archive import ResponseArchive
+from instrumentation import metrics
+from results_table import CostResultTable
+
+
+SCENARIO_FIELDS = [
+    'make', 'model', 'mileage', 'state', 'gas_grade',
+    'purchase_price', 'loan_interest_rate', 'loan_term_years', 'down_payment_amount',
+]
+RESULT_FIELDS = ['monthly_loan_payment', 'monthly_gas_cost', 'monthly_repair_maintenance_cost', 'total_monthly_cost', 'error']
+# Output formats held in a CostResultTable and written once all scenarios are priced
+COLUMNAR_FORMATS = {'.parquet': 'parquet', '.arrow': 'arrow', '.columns': 'columns'}
+
+
+def read_scenarios(file, file_format):
+    """
+    Lazily read scenarios from a CSV or JSONL file.
+
+    Args:
+        file (file object): The open input file.
+        file_format (str): Either 'csv' or 'jsonl'.
+
+    Yields:
+        dict: One scenario per row, with the raw values from the file.
+    """
+    if file_format == 'csv':
+        yield from csv.DictReader(file)
+    else:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_chunks(scenarios, chunk_size):
+    """
+    Split an iterable of scenarios into lists of at most chunk_size scenarios.
+
+    Args:
+        scenarios (iterable): The scenarios to split.
+        chunk_size (int): The maximum number of scenarios per chunk.
+
+    Yields:
+        list: The next chunk of scenarios.
+    """
+    iterator = iter(scenarios)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def init_worker(snapshot_data, collect_metrics=False, archive_path=None):
+    """
+    Prepare a worker process: pin the shared gas price snapshot and keep scraper logging off stdout.
+
+    Args:
+        snapshot_data (dict): The gas price snapshot, as returned by GasPriceSnapshot.to_dict().
+        collect_metrics (bool, optional): Whether to record instrumentation metrics. Defaults to False.
+        archive_path (str, optional): Response archive to replay web requests from. Defaults to None.
+    """
+    sys.stdout = sys.stderr
+    if collect_metrics:
+        metrics.enable()
+    from calculator import gas_price_store, scraper
+    if archive_path:
+        scraper.use_archive(ResponseArchive.load(archive_path))
+    gas_price_store.pin(GasPriceSnapshot(
+        snapshot_data['prices'], fetched_at=snapshot_data['fetched_at'], url=snapshot_data['url']
+    ))
+
+
+def price_chunk(chunk):
+    """
+    Calculate the total monthly costs of every scenario in a chunk.
+
+    Args:
+        chunk (list): Scenario dictionaries with the keys in SCENARIO_FIELDS. The loan
+                      interest rate is an annual fraction (0.05 for 5%).
+
+    Returns:
+        list: One dictionary per scenario with the scenario and its results. Scenarios that
+              could not be priced have an 'error' message instead of results.
+    """
+    from calculator import VehicleCostCalculator
+    calculator = VehicleCostCalculator()
+
+    results = []
+    for scenario in chunk:
+        result = {field: scenario.get(field) for field in SCENARIO_FIELDS}
+        try:
+            financial_info = (
+                float(scenario['purchase_price']),
+                float(scenario['loan_interest_rate']),
+                int(scenario['loan_term_years']),
+                float(scenario.get('down_payment_amount') or 0),
+            )
+            result.update(calculator.calculate_total_costs(
+                scenario['make'], scenario['model'], float(scenario['mileage']),
+                scenario['state'], scenario['gas_grade'], financial_info, None, GAS_PRICES_URL
+            ))
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        results.append(result)
+    return results
+
+
+def price_chunk_with_metrics(chunk):
+    """
+    Price a chunk like price_chunk, also returning the metrics the worker recorded meanwhile.
+
+    Args:
+        chunk (list): Scenario dictionaries with the keys in SCENARIO_FIELDS.
+
+    Returns:
+        tuple: Contains the results of price_chunk and the metrics as returned by Metrics.collect().
+    """
+    results = price_chunk(chunk)
+    return results, metrics.collect()
+
+
+def price_scenarios(scenarios, snapshot, chunk_size=500, workers=None, archive_path=None):
+    """
+    Price scenarios across a process pool, keeping only a bounded number of chunks in flight.
+
+    If metrics are enabled in this process, the workers record them too and they are
+    merged into this process's registry as chunks complete.
+
+    Args:
+        scenarios (iterable): The scenario dictionaries to price.
+        snapshot (GasPriceSnapshot): The gas prices every worker uses.
+        chunk_size (int, optional): Scenarios per chunk sent to a worker. Defaults to 500.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+        archive_path (str, optional): Response archive every worker replays web requests from,
+                                      instead of using the network. Defaults to None.
+
+    Yields:
+        dict: The result of each scenario, in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    collect_metrics = metrics.enabled
+
+    def get_results(future):
+        if not collect_metrics:
+            return future.result()
+        results, worker_metrics = future.result()
+        metrics.merge(worker_metrics)
+        return results
+
+    # Spawn rather than fork, so workers never share this process's SQLite cache connection
+    # or pooled HTTP connections, which are not safe to use across fork()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=init_worker,
+                             initargs=(snapshot.to_dict(), collect_metrics, archive_path)) as executor:
+        pending = deque()
+        for chunk in read_chunks(scenarios, chunk_size):
+            pending.append(executor.submit(price_chunk_with_metrics if collect_metrics else price_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from get_results(pending.popleft())
+        while pending:
+            yield from get_results(pending.popleft())
+
+
+def write_columnar_results(results, path, file_format):
+    """
+    Collect results into a CostResultTable and write it in a columnar format.
+
+    Args:
+        results (iterable): The result dictionaries.
+        path (str): The file to write, or for 'columns' the directory.
+        file_format (str): One of 'parquet', 'arrow' (both need pyarrow) or 'columns', a
+                           directory of memory-mappable .npy files read by CostResultTable.load.
+    """
+    table = CostResultTable.from_results(results)
+    if file_format == 'parquet':
+        table.write_parquet(path)
+    elif file_format == 'arrow':
+        table.write_arrow(path)
+    else:
+        table.save(path)
+
+
+def write_results(results, file, file_format):
+    """
+    Stream results to a CSV or JSONL file as they are produced.
+
+    Args:
+        results (iterable): The result dictionaries.
+        file (file object): The open output file.
+        file_format (str): Either 'csv' or 'jsonl'.
+    """
+    if file_format == 'csv':
+        writer = csv.DictWriter(file, fieldnames=SCENARIO_FIELDS + RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    else:
+        for result in results:
+            file.write(json.dumps(result) + "\n")
+
+
+def get_file_format(path, file_format):
+    """
+    Work out the format of a file from an explicit choice or its extension.
+
+    Args:
+        path (str): The file path, or '-' for stdin/stdout.
+        file_format (str): The format given on the command line, or None.
+
+    Returns:
+        str: 'csv', 'jsonl', or one of the COLUMNAR_FORMATS.
+    """
+    if file_format:
+        return file_format
+    extension = os.path.splitext(path.lower())[1]
+    if extension in COLUMNAR_FORMATS:
+        return COLUMNAR_FORMATS[extension]
+    return 'csv' if extension == '.csv' else 'jsonl'
+
+
+def main(argv=None):
+    """
+    Price vehicle/loan scenarios from a file without any interactive prompts.
+    """
+    parser = argparse.ArgumentParser(description="Price vehicle ownership scenarios in batch.")
+    parser.add_argument('input', help="CSV or JSONL file of scenarios, or '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="CSV, JSONL, Parquet or Arrow file for results, "
+                                                            "a .columns directory, or '-' for stdout")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help="Defaults to the input file extension")
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'] + list(COLUMNAR_FORMATS.values()),
+                        help="Defaults to the output file extension")
+    parser.add_argument('--gas-snapshot', help="Gas price snapshot file to use instead of fetching current prices")
+    parser.add_argument('--chunk-size', type=int, default=500, help="Scenarios per worker task")
+    parser.add_argument('--workers', type=int, help="Number of worker processes")
+    parser.add_argument('--replay', help="Response archive to replay web requests from, without network access")
+    parser.add_argument('--metrics', help="Write timing and counter metrics to this file (.json, or Prometheus text otherwise)")
+    args = parser.parse_args(argv)
+    output_format = get_file_format(args.output, args.output_format)
+    is_columnar = output_format in COLUMNAR_FORMATS.values()
+    if is_columnar and args.output == '-':
+        parser.error(f"{output_format} results must be written to a file")
+
+    if args.metrics:
+        metrics.enable()
+
+    if args.gas_snapshot:
+        snapshot = GasPriceSnapshot.load(args.gas_snapshot)
+    else:
+        with contextlib.redirect_stdout(sys.stderr):
+            from calculator import gas_price_store, scraper
+            if args.replay:
+                scraper.use_archive(ResponseArchive.load(args.replay))
+            snapshot = gas_price_store.get_snapshot(GAS_PRICES_URL)
+        if snapshot is None:
+            sys.exit("Could not fetch gas prices.")
+
+    input_file = sys.stdin if args.input == '-' else open(args.input, 'r', newline='')
+    output_file = None
+    if not is_columnar:
+        output_file = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        scenarios = read_scenarios(input_file, get_file_format(args.input, args.input_format))
+        results = price_scenarios(scenarios, snapshot, args.chunk_size, args.workers, args.replay)
+        if is_columnar:
+            write_columnar_results(results, args.output, output_format)
+        else:
+            write_results(results, output_file, output_format)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file not in (None, sys.stdout):
+            output_file.close()
+        if args.metrics:
+            metrics.write(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import timeit
+
+from offline import load_fixture
+from parsers import SoupParser, LxmlParser, lxml
+
+PARSE_METHODS = {
+    'gas_prices.html': 'parse_gas_prices',
+    'vehicle_mpg.html': 'parse_vehicle_mpg',
+    'maintenance_costs.html': 'parse_maintenance_costs',
+}
+
+
+def main(number=20):
+    """
+    Time every parser backend on every fixture and check they extract the same data.
+
+    Args:
+        number (int, optional): Parses per timing run. Defaults to 20.
+    """
+    parsers = {'soup': SoupParser()}
+    if lxml is not None:
+        parsers['lxml'] = LxmlParser()
+    else:
+        print("lxml is not installed, only timing SoupParser.")
+
+    for file_name, method in PARSE_METHODS.items():
+        html = load_fixture(file_name)
+        results = {name: getattr(parser, method)(html) for name, parser in parsers.items()}
+        if any(result != results['soup'] for result in results.values()):
+            raise AssertionError(f"Parser backends disagree on {file_name}")
+
+        timings = {
+            name: min(timeit.repeat(lambda: getattr(parser, method)(html), number=number, repeat=3)) / number
+            for name, parser in parsers.items()
+        }
+        print(f"{file_name}:")
+        for name, seconds in timings.items():
+            speedup = timings['soup'] / seconds
+            print(f"  {name:<5} {seconds * 1000:8.2f} ms  ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import json
+import time
+
+import aiohttp
+import numpy as np
+
+SCENARIO = {
+    'make': 'BMW', 'model': 'X1', 'mileage': 12000, 'state': 'Texas', 'gas_grade': 'Regular',
+    'purchase_price': 35000, 'loan_interest_rate': 0.0549, 'loan_term_years': 5, 'down_payment_amount': 3000,
+}
+
+
+def get_payload(endpoint, batch_size):
+    """
+    Build the request body for an endpoint.
+
+    Args:
+        endpoint (str): The API path, e.g. '/loan-payment'.
+        batch_size (int): Items per request. 1 sends a single object, except for /compare.
+
+    Returns:
+        The JSON body.
+    """
+    if endpoint == '/compare':
+        return [dict(SCENARIO, purchase_price=SCENARIO['purchase_price'] + index * 500)
+                for index in range(max(batch_size, 2))]
+    if batch_size == 1:
+        return SCENARIO
+    return [dict(SCENARIO, mileage=SCENARIO['mileage'] + index) for index in range(batch_size)]
+
+
+async def run_load(url, payload, requests, concurrency):
+    """
+    Send requests from a fixed number of concurrent clients and time each one.
+
+    Args:
+        url (str): The full endpoint URL.
+        payload: The JSON body of every request.
+        requests (int): Total number of requests.
+        concurrency (int): Number of requests in flight at once.
+
+    Returns:
+        tuple: Contains the total seconds, the per-request latencies and the number of errors.
+    """
+    body = json.dumps(payload)
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def client(session):
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            async with session.post(url, data=body, headers={'Content-Type': 'application/json'}) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def main(argv=None):
+    """
+    Load test a running api_server, e.g. one started with --replay and --gas-snapshot.
+    """
+    parser = argparse.ArgumentParser(description="Load test the vehicle cost API server.")
+    parser.add_argument('endpoint', choices=['/loan-payment', '/gas-cost', '/maintenance-cost', '/compare'])
+    parser.add_argument('--url', default='http://127.0.0.1:8080', help="Base URL of the server")
+    parser.add_argument('-n', '--requests', type=int, default=1000, help="Total number of requests")
+    parser.add_argument('-c', '--concurrency', type=int, default=32, help="Requests in flight at once")
+    parser.add_argument('--batch-size', type=int, default=1, help="Items per request")
+    args = parser.parse_args(argv)
+
+    payload = get_payload(args.endpoint, args.batch_size)
+    seconds, latencies, errors = asyncio.run(
+        run_load(args.url + args.endpoint, payload, args.requests, args.concurrency)
+    )
+    latencies = np.array(latencies) * 1000
+    print(f"{args.requests} requests in {seconds:.2f} s: {args.requests / seconds:.0f} requests/s, "
+          f"{args.requests * args.batch_size / seconds:.0f} items/s, {errors} errors")
+    print(f"latency ms: p50 {np.percentile(latencies, 50):.2f}  p95 {np.percentile(latencies, 95):.2f}  "
+          f"p99 {np.percentile(latencies, 99):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from currency_converter import ExchangeRateTable
+from scraper import Scraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture(file_name):
+    """
+    Read a saved page from the fixtures directory.
+
+    Args:
+        file_name (str): The fixture file name.
+
+    Returns:
+        str: The file contents.
+    """
+    with open(os.path.join(FIXTURES_DIR, file_name), 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+class FixtureScraper(Scraper):
+    """
+    A Scraper that serves every page from the saved fixtures instead of the network.
+    """
+    def fetch_url(self, url, headers=None, retries=3, timeout=10):
+        """
+        Return the fixture page matching a URL.
+
+        Args:
+            url (str): The URL that would have been fetched.
+
+        Returns:
+            str: The HTML of the matching fixture page.
+        """
+        if 'gasprices.aaa.com' in url:
+            return load_fixture('gas_prices.html')
+        if '/maintenance' in url:
+            return load_fixture('maintenance_costs.html')
+        return load_fixture('vehicle_mpg.html')
+
+
+def get_fixture_rate_table():
+    """
+    Get an exchange rate table loaded from the saved rates, which never expires.
+
+    Returns:
+        ExchangeRateTable: The table.
+    """
+    rate_table = ExchangeRateTable(ttl=float('inf'))
+    rate_table.load(os.path.join(FIXTURES_DIR, 'exchange_rates.json'))
+    return rate_table
@@ -0,0 +1,163 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import timeit
+
+import numpy as np
+
+from offline import FixtureScraper, get_fixture_rate_table
+from calculator import VehicleCostCalculator
+from currency_converter import ConvertCurrency
+from gas_prices import GasPriceStore, GAS_PRICES_URL
+from vehicle_catalog import VehicleCatalog
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'vehicle_details.json')
+
+
+def calibration_workload():
+    """
+    A fixed pure-Python workload, timed next to every benchmark as a measure of how fast
+    the machine is at that moment.
+
+    Benchmark times are divided by its time before they are compared to the baseline, so
+    the baseline holds speed ratios that carry over between machines and background load.
+    """
+    counts = {}
+    for i in range(20000):
+        key = str(i % 97)
+        counts[key] = counts.get(key, 0) + i * i
+    return sorted(counts.items())
+
+
+def get_benchmarks():
+    """
+    Build every benchmark, all running fully offline against the saved fixtures.
+
+    Returns:
+        dict: Benchmark names mapped to (function, calls per timing run).
+    """
+    scraper = FixtureScraper()
+    gas_price_store = GasPriceStore(scraper)
+    calculator = VehicleCostCalculator(scraper=scraper, gas_price_store=gas_price_store)
+    converter = ConvertCurrency('USD', 'EUR', rate_table=get_fixture_rate_table())
+    financial_info = (35000, 0.0549, 5, 3000)
+
+    rng = np.random.default_rng(0)
+    principals = rng.uniform(5000, 80000, 1_000_000)
+    rates = rng.integers(0, 1500, 1_000_000) / 10000
+    terms = rng.integers(1, 9, 1_000_000)
+    amounts = rng.uniform(0, 5000, 1_000_000)
+
+    return {
+        'calculate_monthly_loan_payment': (
+            lambda: calculator.calculate_monthly_loan_payment(32000, 0.0549, 5), 100_000),
+        'calculate_monthly_loan_payments_1m': (
+            lambda: calculator.calculate_monthly_loan_payments(principals, rates, terms), 3),
+        'calculate_total_costs': (
+            lambda: calculator.calculate_total_costs('BMW', 'X1', 12000.0, 'Texas', 'Regular',
+                                                     financial_info, None, GAS_PRICES_URL), 20),
+        'get_gas_prices': (lambda: scraper.get_gas_prices(GAS_PRICES_URL), 20),
+        'get_vehicle_mpg': (lambda: scraper.get_vehicle_mpg('BMW', 'X1'), 20),
+        'get_maintenance_costs': (lambda: scraper.get_maintenance_costs('BMW', 'X1', 12000), 20),
+        'convert_currency': (lambda: converter.convert_currency(1234.56), 100_000),
+        'convert_many_1m': (lambda: converter.convert_many(amounts), 10),
+        'load_vehicle_catalog': (lambda: VehicleCatalog(CATALOG_PATH).load(), 200),
+    }
+
+
+def run_benchmarks(names=None, repeat=7):
+    """
+    Time each benchmark, alternating its timing runs with runs of calibration_workload.
+
+    Args:
+        names (list, optional): Only run these benchmarks. Defaults to all of them.
+        repeat (int, optional): Timing runs per benchmark. Defaults to 7.
+
+    Returns:
+        tuple: Contains dictionaries of benchmark names mapped to their best time per call
+               in seconds, and to that time divided by the best calibration time of the
+               same runs.
+    """
+    results = {}
+    relative = {}
+    # Keep the scrapers' progress messages out of the report
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        calibration_workload()
+        for name, (function, number) in get_benchmarks().items():
+            if names and name not in names:
+                continue
+            function()  # Warm up caches and lazy imports
+            times, calibration_times = [], []
+            for _ in range(repeat):
+                calibration_times.append(timeit.timeit(calibration_workload, number=5) / 5)
+                times.append(timeit.timeit(function, number=number) / number)
+            results[name] = min(times)
+            relative[name] = min(times) / min(calibration_times)
+    return results, relative
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Find the benchmarks that got slower than the baseline allows.
+
+    Args:
+        results (dict): The new times per call, relative to calibration_workload.
+        baseline (dict): The stored times per call, relative to calibration_workload.
+        tolerance (float): Allowed slowdown as a fraction, e.g. 0.25 for 25%.
+
+    Returns:
+        list: Tuples of (name, baseline time, new time) for every regression.
+    """
+    return [
+        (name, baseline[name], seconds)
+        for name, seconds in results.items()
+        if name in baseline and seconds > baseline[name] * (1 + tolerance)
+    ]
+
+
+def main(argv=None):
+    """
+    Run the benchmarks, write the results as JSON and fail on regressions against the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the calculator and scraper hot paths offline.")
+    parser.add_argument('names', nargs='*', help="Benchmarks to run. Defaults to all of them.")
+    parser.add_argument('-o', '--output', help="Write results as JSON to this file")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed slowdown, as a fraction")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results, relative = run_benchmarks(args.names)
+    report = {'python': platform.python_version(), 'machine': platform.machine(),
+              'results': results, 'relative': relative}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+    for name, seconds in results.items():
+        print(f"{name:<36} {seconds * 1e6:12.2f} us {relative[name]:12.3e} x calibration")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=4)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        sys.exit(f"No baseline at {args.baseline}. Run with --save-baseline to create one.")
+    with open(args.baseline, 'r') as file:
+        baseline = json.load(file)
+    if 'relative' not in baseline:
+        sys.exit(f"{args.baseline} has no calibrated results. Run with --save-baseline to update it.")
+    regressions = compare_to_baseline(relative, baseline['relative'], args.tolerance)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before:.3e} -> {after:.3e} x calibration")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
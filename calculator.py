@@ -1,12 +1,45 @@
 from scraper import Scraper
-import json
-
-scraper = Scraper()
+from scraper_cache import ScraperCache
+from gas_prices import GasPriceStore, GAS_PRICES_URL
+from vehicle_catalog import vehicle_catalog
+from maintenance_index import MaintenanceIndex
+from instrumentation import metrics
+import numpy as np
+
+scraper = Scraper(cache=ScraperCache())
+gas_price_store = GasPriceStore(scraper)
+maintenance_index = MaintenanceIndex(scraper)
+# Aliases for the constructor, whose arguments shadow the module-level names
+shared_scraper = scraper
+shared_gas_price_store = gas_price_store
+shared_maintenance_index = maintenance_index
 
 class VehicleCostCalculator:
     """
     A class used to calculate vehicle costs including financial, gas, and maintenance costs.
     """
+    def __init__(self, annuity_table=None, scraper=None, gas_price_store=None, maintenance_index=None):
+        """
+        Initialize the VehicleCostCalculator class.
+
+        Args:
+            annuity_table (AnnuityFactorTable, optional): Precomputed payment factors used for
+                                                          loans on its rate/term grid. Defaults
+                                                          to None, which always uses the closed form.
+            scraper (Scraper, optional): The scraper for MPG and maintenance costs. Defaults to
+                                         the shared module-level scraper.
+            gas_price_store (GasPriceStore, optional): The source of gas prices. Defaults to the
+                                                       shared module-level store.
+            maintenance_index (MaintenanceIndex, optional): The source of maintenance costs. Defaults
+                                                            to the shared module-level index, or to a
+                                                            new index over the given scraper.
+        """
+        self.annuity_table = annuity_table
+        self.scraper = scraper if scraper is not None else shared_scraper
+        self.gas_price_store = gas_price_store if gas_price_store is not None else shared_gas_price_store
+        if maintenance_index is None:
+            maintenance_index = shared_maintenance_index if scraper is None else MaintenanceIndex(scraper)
+        self.maintenance_index = maintenance_index
 
     def get_financial_info(self):
         """
@@ -43,22 +76,178 @@ class VehicleCostCalculator:
         Returns:
             float: The monthly loan payment.
         """
+        if self.annuity_table is not None:
+            factors = self.annuity_table.get_factors(annual_rate, years)
+            if factors is not None:
+                numerator, denominator = factors
+                return principal * numerator / denominator
         monthly_rate = annual_rate / 12
         n = years * 12
         if monthly_rate == 0:
             return principal / n
         return principal * (monthly_rate * (1 + monthly_rate) ** n) / ((1 + monthly_rate) ** n - 1)
 
+    @metrics.timed('calculator_seconds', {'method': 'calculate_monthly_loan_payments'})
+    def calculate_monthly_loan_payments(self, principals, annual_rates, years):
+        """
+        Calculate monthly loan payments for many loans in one vectorized pass.
+
+        Uses the same formula and order of operations as
+        calculate_monthly_loan_payment, so every element matches the scalar
+        result exactly, including the zero-rate branch.
+
+        Args:
+            principals (array_like): The principal loan amounts.
+            annual_rates (array_like): The annual interest rates.
+            years (array_like): The loan terms in years.
+
+        Returns:
+            numpy.ndarray: The monthly loan payments as float64, broadcast to the
+                           common shape of the inputs.
+        """
+        principals, annual_rates, years = np.broadcast_arrays(
+            np.asarray(principals, dtype=np.float64),
+            np.asarray(annual_rates, dtype=np.float64),
+            np.asarray(years, dtype=np.float64),
+        )
+        monthly_rates = annual_rates / 12
+        n = years * 12
+        payments = np.empty(monthly_rates.shape, dtype=np.float64)
+        pending = np.ones(monthly_rates.shape, dtype=bool)
+
+        if self.annuity_table is not None:
+            on_grid, numerators, denominators = self.annuity_table.get_factor_arrays(annual_rates, years)
+            np.multiply(principals, numerators, out=payments)
+            payments /= denominators
+            pending = ~on_grid
+            if not pending.any():
+                return payments
+
+        zero_rate = (monthly_rates == 0) & pending
+        np.divide(principals, n, out=payments, where=zero_rate)
+
+        # Only evaluate the annuity formula where the rate is non-zero to avoid 0/0.
+        # float_power goes through the C library pow() like Python's ** does, whereas
+        # np.power may use SIMD kernels that differ from it in the last bit.
+        has_rate = ~zero_rate & pending
+        rates = monthly_rates[has_rate]
+        growth = np.float_power(1 + rates, n[has_rate])
+        payments[has_rate] = principals[has_rate] * (rates * growth) / (growth - 1)
+        return payments
+
+    @metrics.timed('calculator_seconds', {'method': 'calculate_payment_factors'})
+    def calculate_payment_factors(self, annual_rates, years):
+        """
+        Calculate the numerator and denominator of the monthly payment formula per unit principal.
+
+        A payment is principal * numerator / denominator, which matches
+        calculate_monthly_loan_payment exactly. Zero rates get a numerator of 1 and a
+        denominator of the number of months.
+
+        Args:
+            annual_rates (array_like): The annual interest rates.
+            years (array_like): The loan terms in years.
+
+        Returns:
+            tuple: Contains the numerators and denominators as float64 arrays, broadcast to the
+                   common shape of the inputs.
+        """
+        annual_rates, years = np.broadcast_arrays(
+            np.asarray(annual_rates, dtype=np.float64), np.asarray(years, dtype=np.float64)
+        )
+        monthly_rates = annual_rates / 12
+        n = years * 12
+        growth = np.float_power(1 + monthly_rates, n)
+        zero_rate = monthly_rates == 0
+        numerators = np.where(zero_rate, 1.0, monthly_rates * growth)
+        denominators = np.where(zero_rate, n, growth - 1)
+        return numerators, denominators
+
+    def generate_amortization_schedule(self, principal, annual_rate, years):
+        """
+        Lazily generate the amortization schedule of a loan, one period at a time.
+
+        The final period absorbs any rounding drift so the closing balance is exactly zero.
+
+        Args:
+            principal (float): The principal loan amount.
+            annual_rate (float): The annual interest rate.
+            years (int): The loan term in years.
+
+        Yields:
+            tuple: Contains the period number (starting at 1), payment, interest paid,
+                   principal paid, and remaining balance for that period.
+        """
+        monthly_rate = annual_rate / 12
+        n = int(years * 12)
+        payment = self.calculate_monthly_loan_payment(principal, annual_rate, years)
+        balance = principal
+        for period in range(1, n + 1):
+            interest = balance * monthly_rate
+            if period == n:
+                principal_paid = balance
+                payment = interest + principal_paid
+            else:
+                principal_paid = payment - interest
+            balance -= principal_paid
+            yield period, payment, interest, principal_paid, balance
+
+    @metrics.timed('calculator_seconds', {'method': 'calculate_amortization_schedule'})
+    def calculate_amortization_schedule(self, principals, annual_rates, years):
+        """
+        Calculate amortization schedules for one or many loans into preallocated arrays.
+
+        Loans are processed together one period at a time, so the cost is a handful of
+        array operations per month of the longest term rather than per loan. Periods
+        past the end of a shorter loan are left as zero.
+
+        Args:
+            principals (array_like): The principal loan amounts.
+            annual_rates (array_like): The annual interest rates.
+            years (array_like): The loan terms in years.
+
+        Returns:
+            dict: Float64 arrays for 'payment', 'interest', 'principal' and 'balance', each
+                  shaped as the broadcast inputs plus a trailing period axis.
+        """
+        principals, annual_rates, years = np.broadcast_arrays(
+            np.asarray(principals, dtype=np.float64),
+            np.asarray(annual_rates, dtype=np.float64),
+            np.asarray(years, dtype=np.float64),
+        )
+        monthly_rates = annual_rates / 12
+        n = (years * 12).astype(np.int64)
+        periods = int(n.max()) if n.size else 0
+        shape = principals.shape + (periods,)
+        schedule = {
+            'payment': np.zeros(shape, dtype=np.float64),
+            'interest': np.zeros(shape, dtype=np.float64),
+            'principal': np.zeros(shape, dtype=np.float64),
+            'balance': np.zeros(shape, dtype=np.float64),
+        }
+
+        payment = self.calculate_monthly_loan_payments(principals, annual_rates, years)
+        balance = principals.copy()
+        for period in range(periods):
+            active = period < n
+            interest = balance * monthly_rates
+            last = period == n - 1
+            principal_paid = np.where(last, balance, payment - interest)
+            np.copyto(schedule['payment'][..., period], np.where(last, interest + principal_paid, payment), where=active)
+            np.copyto(schedule['interest'][..., period], interest, where=active)
+            np.copyto(schedule['principal'][..., period], principal_paid, where=active)
+            balance = np.where(active, balance - principal_paid, 0.0)
+            np.copyto(schedule['balance'][..., period], balance, where=active)
+        return schedule
+
     def get_vehicle_details(self):
         """
-        Read vehicle details from a JSON file.
+        Get the vehicle details from the shared catalog, read once from the JSON file.
 
         Returns:
             dict: A dictionary containing vehicle makes, models, and mileages.
         """
-        with open("vehicle_details.json", "r") as json_file:
-            makes_models_mileages_dict = json.load(json_file)
-        return makes_models_mileages_dict
+        return vehicle_catalog.details
 
     def display_available_options(self, options):
         """
@@ -107,6 +296,8 @@ class VehicleCostCalculator:
         Returns:
             str: The selected option.
         """
+        if isinstance(options, dict):
+            options = list(options.keys())
         while True:
             self.display_available_options(options)
             choice = input(prompt)
@@ -140,14 +331,12 @@ class VehicleCostCalculator:
         Returns:
             tuple: Contains the make, model, and mileage of the vehicle.
         """
-        vehicle_details = self.get_vehicle_details()
-
         print(f"Enter details for vehicle {vehicle_number}:")
         print("Choose one of the following Makes:")
-        makes = [make for make in vehicle_details.keys() if make != "Mileage"]
+        makes = vehicle_catalog.get_makes()
         make = self.validate_user_input(makes, "Enter Choice: ")
         print("Choose one of the following Models:")
-        models = vehicle_details[make]
+        models = vehicle_catalog.get_models(make)
         model = self.validate_user_input(models, "Enter Choice: ")
         mileage = self.get_driving_habits()
 
@@ -163,7 +352,7 @@ class VehicleCostCalculator:
             tuple: Contains the selected state and gas grade.
         """
         try:
-            gas_price_details = scraper.get_gas_prices("https://gasprices.aaa.com/state-gas-price-averages/")
+            gas_price_details = self.gas_price_store.get_snapshot(GAS_PRICES_URL).prices
 
             print("Choose one of the following States:")
             states = [state for state in gas_price_details.keys()]
@@ -177,9 +366,11 @@ class VehicleCostCalculator:
         except AttributeError:
             pass
 
+    @metrics.timed('calculator_seconds', {'method': 'calculate_annual_repair_maintenance_cost'})
     def calculate_annual_repair_maintenance_cost(self, make, model, mileage):
         """
-        Calculate the annual repair and maintenance cost.
+        Calculate the annual repair and maintenance cost, interpolated between the nearest
+        mileage buckets of the maintenance index.
 
         Args:
             make (str): The make of the vehicle.
@@ -189,10 +380,27 @@ class VehicleCostCalculator:
         Returns:
             float: The annual repair and maintenance cost.
         """
-        annual_maintenance_cost = scraper.get_maintenance_costs(make, model, mileage)
+        annual_maintenance_cost = self.maintenance_index.get_maintenance_costs(make, model, mileage)
         if annual_maintenance_cost is not None:
             return annual_maintenance_cost
 
+    @metrics.timed('calculator_seconds', {'method': 'get_maintenance_cost_curve'})
+    def get_maintenance_cost_curve(self, make, model, mileage):
+        """
+        Get the annual repair and maintenance cost of every year of ownership, interpolated
+        between the nearest mileage buckets of the maintenance index.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            mileage (int): The mileage of the vehicle.
+
+        Returns:
+            numpy.ndarray: The float64 costs of years 1, 2, ..., with NaN for any missing
+                           year, or None if they could not be scraped.
+        """
+        return self.maintenance_index.get_curve(make, model, mileage)
+
     def get_monthly_repair_maintenance_cost(self, annual_maintenance_cost):
         """
         Get the monthly repair and maintenance cost.
@@ -206,6 +414,7 @@ class VehicleCostCalculator:
         if annual_maintenance_cost is not None:
             return annual_maintenance_cost / 12
 
+    @metrics.timed('calculator_seconds', {'method': 'calculate_monthly_gas_cost'})
     def calculate_monthly_gas_cost(self, make, model, mileage, state, gas_grade, gas_prices_url):
         """
         Calculate the monthly gas cost for a vehicle.
@@ -221,16 +430,15 @@ class VehicleCostCalculator:
         Returns:
             float: The monthly gas cost for the vehicle.
         """
-        scraper = Scraper()
-        mpg = scraper.get_vehicle_mpg(make, model)
-        gas_prices = scraper.get_gas_prices(gas_prices_url)
+        mpg = self.scraper.get_vehicle_mpg(make, model)
+        gas_prices = self.gas_price_store.get_snapshot(gas_prices_url).prices
         
         if state in gas_prices:
             if gas_grade is None:
                 return None
             elif gas_grade in gas_prices[state]:
-                gas_price_per_gallon = float(gas_prices[state][gas_grade])
-                return (mileage / mpg) * gas_price_per_gallon / 12
+                gas_price_per_gallon = gas_prices[state][gas_grade]
+                return self.calculate_gas_cost(mileage, mpg, gas_price_per_gallon)
             else:
                 print(f"No gas price data available for {gas_grade} gas in {state}.")
                 return None
@@ -238,6 +446,23 @@ class VehicleCostCalculator:
             print(f"No gas price data available for {state}.")
             return None
 
+    def calculate_gas_cost(self, mileage, mpg, gas_price_per_gallon):
+        """
+        Calculate the monthly gas cost from annual mileage, fuel economy and gas price.
+
+        Works element-wise on NumPy arrays as well as on single numbers.
+
+        Args:
+            mileage (float or numpy.ndarray): The miles driven annually.
+            mpg (float or numpy.ndarray): The fuel economy in miles per gallon.
+            gas_price_per_gallon (float or numpy.ndarray): The price of a gallon of gas.
+
+        Returns:
+            float or numpy.ndarray: The monthly gas cost.
+        """
+        return (mileage / mpg) * gas_price_per_gallon / 12
+
+    @metrics.timed('calculator_seconds', {'method': 'calculate_total_costs'})
     def calculate_total_costs(self, make, model, mileage, state, gas_grade, financial_info, annual_maintenance_cost, gas_prices_url):
         """
         Calculate the total monthly costs for a vehicle.
@@ -270,6 +495,83 @@ class VehicleCostCalculator:
             'total_monthly_cost': total_monthly_cost
         }
 
+    def calculate_ownership_schedule(self, monthly_loan_payment, loan_term_years, monthly_gas_cost,
+                                     maintenance_cost_curve, years, down_payment_amount=0):
+        """
+        Calculate the cost of each year of ownership from already known monthly costs.
+
+        Loan payments stop at the end of the loan term, and years past the end of the
+        maintenance cost curve repeat its last known year.
+
+        Args:
+            monthly_loan_payment (float): The monthly loan payment.
+            loan_term_years (float): The loan term in years.
+            monthly_gas_cost (float): The monthly gas cost, or None if unknown.
+            maintenance_cost_curve (numpy.ndarray): The annual maintenance cost of years 1, 2, ...,
+                                                    or None if unknown.
+            years (int): The number of years of ownership.
+            down_payment_amount (float, optional): The down payment, paid up front. Defaults to 0.
+
+        Returns:
+            dict: Float64 arrays with one value per year for 'year', 'loan_payments',
+                  'gas_cost', 'repair_maintenance_cost', 'total_cost' and 'cumulative_cost'
+                  (which includes the down payment), and the 'total_cost_of_ownership'.
+                  Unknown costs are NaN.
+        """
+        year_numbers = np.arange(1, years + 1, dtype=np.float64)
+        loan_months = np.clip(loan_term_years * 12 - (year_numbers - 1) * 12, 0, 12)
+        loan_payments = monthly_loan_payment * loan_months
+        gas_cost = np.full(years, np.nan if monthly_gas_cost is None else monthly_gas_cost * 12)
+        if maintenance_cost_curve is None or len(maintenance_cost_curve) == 0:
+            repair_maintenance_cost = np.full(years, np.nan)
+        else:
+            last_year = len(maintenance_cost_curve) - 1
+            repair_maintenance_cost = maintenance_cost_curve[np.minimum(np.arange(years), last_year)]
+        total_cost = loan_payments + gas_cost + repair_maintenance_cost
+        cumulative_cost = down_payment_amount + np.cumsum(total_cost)
+        return {
+            'year': year_numbers,
+            'loan_payments': loan_payments,
+            'gas_cost': gas_cost,
+            'repair_maintenance_cost': repair_maintenance_cost,
+            'total_cost': total_cost,
+            'cumulative_cost': cumulative_cost,
+            'total_cost_of_ownership': cumulative_cost[-1] if years else float(down_payment_amount),
+        }
+
+    @metrics.timed('calculator_seconds', {'method': 'calculate_ownership_costs'})
+    def calculate_ownership_costs(self, make, model, mileage, state, gas_grade, financial_info, gas_prices_url,
+                                  years=None):
+        """
+        Calculate the total cost of ownership of a vehicle, year by year, over the loan term.
+
+        The maintenance costs of every year come from the single page already scraped
+        for the first-year cost, so no extra requests are made.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            mileage (int): The mileage of the vehicle.
+            state (str): The state where the user is located.
+            gas_grade (str): The grade of gas to be used.
+            financial_info (tuple): Contains purchase price, loan interest rate, loan term, and down payment amount.
+            gas_prices_url (str): The URL to scrape for gas prices.
+            years (int, optional): The number of years of ownership. Defaults to the loan term,
+                                   rounded up to whole years.
+
+        Returns:
+            dict: The yearly costs, as returned by calculate_ownership_schedule.
+        """
+        purchase_price, loan_interest_rate, loan_term_years, down_payment_amount = financial_info
+        if years is None:
+            years = int(np.ceil(loan_term_years))
+        principal = purchase_price - down_payment_amount
+        monthly_loan_payment = self.calculate_monthly_loan_payment(principal, loan_interest_rate, loan_term_years)
+        monthly_gas_cost = self.calculate_monthly_gas_cost(make, model, mileage, state, gas_grade, gas_prices_url)
+        maintenance_cost_curve = self.get_maintenance_cost_curve(make, model, mileage)
+        return self.calculate_ownership_schedule(monthly_loan_payment, loan_term_years, monthly_gas_cost,
+                                                 maintenance_cost_curve, years, down_payment_amount)
+
     def get_valid_float(self, prompt):
         """
         Prompt the user to enter a valid float number.
@@ -0,0 +1,154 @@
+import asyncio
+import math
+
+import numpy as np
+
+from async_scraper import AsyncScraper
+from calculator import VehicleCostCalculator, scraper, gas_price_store, maintenance_index
+from gas_prices import GAS_PRICES_URL
+
+
+COST_FIELDS = ['monthly_loan_payment', 'monthly_gas_cost', 'monthly_repair_maintenance_cost', 'total_monthly_cost']
+
+
+async def gather_vehicle_data(scenarios, async_scraper, gas_prices_url=GAS_PRICES_URL):
+    """
+    Concurrently fetch the gas prices and every scenario's MPG and maintenance costs.
+
+    Maintenance costs are interpolated by the shared maintenance index, so only the
+    mileage buckets around each scenario's mileage are ever fetched.
+
+    Args:
+        scenarios (list): Scenario dictionaries with 'make', 'model' and 'mileage' keys.
+        async_scraper (AsyncScraper): The scraper used for the vehicle pages.
+        gas_prices_url (str, optional): The URL to scrape for gas prices.
+
+    Returns:
+        tuple: Contains the gas price snapshot (or None if it could not be fetched) and a
+               list of (mpg, annual maintenance cost) tuples in scenario order.
+    """
+    # Look each vehicle and mileage up once, however often it appears in the scenarios
+    vehicles = list({(scenario['make'], scenario['model']) for scenario in scenarios})
+    mileages = list({(scenario['make'], scenario['model'], scenario['mileage']) for scenario in scenarios})
+    snapshot_task = asyncio.to_thread(gas_price_store.get_snapshot, gas_prices_url)
+    mpg_tasks = [async_scraper.get_vehicle_mpg(make, model) for make, model in vehicles]
+    maintenance_tasks = [
+        maintenance_index.fetch_bucket_curves(async_scraper, make, model, mileage) for make, model, mileage in mileages
+    ]
+    snapshot, *mpgs = await asyncio.gather(snapshot_task, *mpg_tasks, *maintenance_tasks)
+    mpg_by_vehicle = dict(zip(vehicles, mpgs))
+    vehicle_data = [
+        (mpg_by_vehicle[(scenario['make'], scenario['model'])],
+         maintenance_index.get_maintenance_costs(scenario['make'], scenario['model'], scenario['mileage'],
+                                                fetch=False))
+        for scenario in scenarios
+    ]
+    return snapshot, vehicle_data
+
+
+def calculate_costs(scenarios, snapshot, vehicle_data):
+    """
+    Calculate the monthly costs of every scenario in one batched pass.
+
+    Uses the same formulas as VehicleCostCalculator.calculate_total_costs. Costs that
+    cannot be calculated because data is missing are NaN.
+
+    Args:
+        scenarios (list): Scenario dictionaries with the keys 'mileage', 'state', 'gas_grade',
+                          'purchase_price', 'loan_interest_rate' (annual fraction),
+                          'loan_term_years' and optionally 'down_payment_amount'.
+        snapshot (GasPriceSnapshot): The gas prices to use, or None.
+        vehicle_data (list): (mpg, annual maintenance cost) tuples in scenario order.
+
+    Returns:
+        dict: Float64 arrays for every field in COST_FIELDS, in scenario order.
+    """
+    def as_array(values):
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+    principals = as_array(s['purchase_price'] - (s.get('down_payment_amount') or 0) for s in scenarios)
+    rates = as_array(s['loan_interest_rate'] for s in scenarios)
+    terms = as_array(s['loan_term_years'] for s in scenarios)
+    mileages = as_array(s['mileage'] for s in scenarios)
+    gas_prices = as_array(
+        snapshot.get_price(s['state'], s['gas_grade']) if snapshot is not None else None for s in scenarios
+    )
+    mpgs = as_array(mpg for mpg, _ in vehicle_data)
+    annual_maintenance_costs = as_array(cost for _, cost in vehicle_data)
+
+    calculator = VehicleCostCalculator()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        monthly_loan_payments = calculator.calculate_monthly_loan_payments(principals, rates, terms)
+        monthly_gas_costs = calculator.calculate_gas_cost(mileages, mpgs, gas_prices)
+    monthly_repair_maintenance_costs = calculator.get_monthly_repair_maintenance_cost(annual_maintenance_costs)
+    return {
+        'monthly_loan_payment': monthly_loan_payments,
+        'monthly_gas_cost': monthly_gas_costs,
+        'monthly_repair_maintenance_cost': monthly_repair_maintenance_costs,
+        'total_monthly_cost': monthly_loan_payments + monthly_gas_costs + monthly_repair_maintenance_costs,
+    }
+
+
+def rank_results(scenarios, costs):
+    """
+    Combine scenarios with their costs and order them from cheapest to most expensive.
+
+    Args:
+        scenarios (list): The scenario dictionaries.
+        costs (dict): Arrays of costs per field, as returned by calculate_costs.
+
+    Returns:
+        list: One dictionary per scenario with its fields, costs (None where unknown), its
+              original 'index' and its 'rank' starting at 1. Scenarios without a total
+              cost are ranked last.
+    """
+    order = np.argsort(costs['total_monthly_cost'], kind='stable')  # NaN sorts last
+    results = []
+    for rank, index in enumerate(order, start=1):
+        result = dict(scenarios[index])
+        for field in COST_FIELDS:
+            value = float(costs[field][index])
+            result[field] = None if math.isnan(value) else value
+        result['index'] = int(index)
+        result['rank'] = rank
+        results.append(result)
+    return results
+
+
+async def compare_vehicles_async(scenarios, async_scraper=None, gas_prices_url=GAS_PRICES_URL):
+    """
+    Compare the monthly costs of any number of vehicle/loan/state scenarios.
+
+    All pages are fetched concurrently, so the comparison takes about as long as the
+    slowest single fetch rather than the sum of them.
+
+    Args:
+        scenarios (list): Scenario dictionaries, as described in calculate_costs, plus
+                          'make' and 'model'.
+        async_scraper (AsyncScraper, optional): The scraper to use. Defaults to a temporary
+                                                one sharing the calculator's cache.
+        gas_prices_url (str, optional): The URL to scrape for gas prices.
+
+    Returns:
+        list: The ranked results, as returned by rank_results.
+    """
+    if async_scraper is None:
+        async with AsyncScraper(scraper) as async_scraper:
+            snapshot, vehicle_data = await gather_vehicle_data(scenarios, async_scraper, gas_prices_url)
+    else:
+        snapshot, vehicle_data = await gather_vehicle_data(scenarios, async_scraper, gas_prices_url)
+    return rank_results(scenarios, calculate_costs(scenarios, snapshot, vehicle_data))
+
+
+def compare_vehicles(scenarios, gas_prices_url=GAS_PRICES_URL):
+    """
+    Compare the monthly costs of any number of scenarios from synchronous code.
+
+    Args:
+        scenarios (list): Scenario dictionaries, as described in compare_vehicles_async.
+        gas_prices_url (str, optional): The URL to scrape for gas prices.
+
+    Returns:
+        list: The ranked results, as returned by rank_results.
+    """
+    return asyncio.run(compare_vehicles_async(scenarios, gas_prices_url=gas_prices_url))
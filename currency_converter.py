@@ -1,26 +1,190 @@
 import requests
 import json
+import threading
+import time
 from dotenv import load_dotenv
+import numpy as np
 import os
+from instrumentation import metrics
 
 # Load environment variables from a .env file
 load_dotenv()
 API_KEY = os.getenv('API_KEY')
 
+
+class ExchangeRateTable:
+    """
+    A process-wide table of USD exchange rates, fetched at most once per time-to-live.
+    """
+    def __init__(self, ttl=60 * 60, file_path=None, archive=None):
+        """
+        Initialize the ExchangeRateTable class.
+
+        Args:
+            ttl (float, optional): Seconds before the rates are fetched again. Defaults to one hour.
+            file_path (str, optional): JSON file to persist the rates to, so a fresh table can be
+                                       reused across runs. Defaults to None, which keeps the
+                                       rates in memory only.
+            archive (ResponseArchive, optional): Archive to record API responses into or replay
+                                                 them from. Defaults to None.
+        """
+        self.ttl = ttl
+        self.file_path = file_path
+        self.rates = None
+        self.fetched_at = 0
+        self.currency_index = None
+        self.rate_matrix = None
+        self._matrix_fetched_at = None
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        self.archive = None
+        if archive is not None:
+            self.use_archive(archive)
+
+    def use_archive(self, archive):
+        """
+        Send every later API request through a response archive, to record or replay it.
+
+        Args:
+            archive (ResponseArchive): The archive to use.
+        """
+        self.archive = archive
+        adapter = archive.get_adapter()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def is_fresh(self):
+        """
+        Check whether rates are loaded and younger than the time-to-live.
+
+        Returns:
+            bool: True if the rates can be used without fetching them again.
+        """
+        return self.rates is not None and time.time() - self.fetched_at <= self.ttl
+
+    def get_rates(self):
+        """
+        Get the conversion rates from USD, loading or fetching them if they are stale.
+
+        Returns:
+            dict: Currency codes mapped to their full-precision rate against USD.
+        """
+        with self._lock:
+            if not self.is_fresh() and self.file_path and os.path.exists(self.file_path):
+                self.load(self.file_path)
+            if not self.is_fresh():
+                url = f"https://v6.exchangerate-api.com/v6/{API_KEY}/latest/USD"
+                with metrics.timer('exchange_rate_fetch_seconds'):
+                    metrics.increment('exchange_rate_requests_total')
+                    response = self.session.get(url)
+                metrics.increment('exchange_rate_bytes_fetched_total', len(response.content))
+                data = response.json()
+                self.rates = data.get('conversion_rates')
+                self.fetched_at = time.time()
+                if self.file_path and self.rates is not None:
+                    self.save(self.file_path)
+            return self.rates
+
+    def get_rate_matrix(self):
+        """
+        Get the cross-rate matrix between every pair of currencies, rebuilt once per refresh.
+
+        Converting an amount from currency i to currency j is a single multiplication by
+        rate_matrix[i, j], at the full precision of the fetched rates.
+
+        Returns:
+            tuple: Contains a dictionary of currency code to row/column index, and the
+                   currency x currency float64 matrix of cross rates.
+        """
+        rates = self.get_rates()
+        with self._lock:
+            if self._matrix_fetched_at != self.fetched_at:
+                codes = list(rates)
+                values = np.array([rates[code] for code in codes], dtype=np.float64)
+                self.currency_index = {code: index for index, code in enumerate(codes)}
+                self.rate_matrix = values[np.newaxis, :] / values[:, np.newaxis]
+                self._matrix_fetched_at = self.fetched_at
+            return self.currency_index, self.rate_matrix
+
+    def get_currency_indexes(self, currencies):
+        """
+        Look up the matrix index of one currency code or an array of them.
+
+        Args:
+            currencies (str or array_like): Currency codes.
+
+        Returns:
+            int or numpy.ndarray: The matching indexes, shaped like the input.
+        """
+        currency_index, _ = self.get_rate_matrix()
+        currencies = np.asarray(currencies)
+        if currencies.ndim == 0:
+            return currency_index[currencies.item()]
+        # Columns of codes are highly repetitive, so only look up each distinct code once
+        unique_codes, inverse = np.unique(currencies, return_inverse=True)
+        indexes = np.array([currency_index[code] for code in unique_codes], dtype=np.intp)
+        return indexes[inverse].reshape(currencies.shape)
+
+    def convert(self, amounts, from_currencies, to_currencies):
+        """
+        Convert amounts between currencies with one matrix lookup and multiply per amount.
+
+        Args:
+            amounts (array_like): The amounts to convert.
+            from_currencies (str or array_like): The currency of each amount, or one code for all.
+            to_currencies (str or array_like): The target currency of each amount, or one code for all.
+
+        Returns:
+            numpy.ndarray: The converted amounts as float64.
+        """
+        _, rate_matrix = self.get_rate_matrix()
+        cross_rates = rate_matrix[self.get_currency_indexes(from_currencies), self.get_currency_indexes(to_currencies)]
+        return np.asarray(amounts, dtype=np.float64) * cross_rates
+
+    @metrics.timed('exchange_rate_save_seconds')
+    def save(self, file_path):
+        """
+        Write the rates and the time they were fetched to a JSON file.
+
+        Args:
+            file_path (str): The path of the file to write.
+        """
+        with open(file_path, 'w') as file:
+            json.dump({'fetched_at': self.fetched_at, 'rates': self.rates}, file)
+
+    @metrics.timed('exchange_rate_load_seconds')
+    def load(self, file_path):
+        """
+        Read rates previously written with save().
+
+        Args:
+            file_path (str): The path of the rates file.
+        """
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+        self.rates = data['rates']
+        self.fetched_at = data['fetched_at']
+
+
+exchange_rates = ExchangeRateTable(file_path='exchange_rates.json')
+
 class ConvertCurrency:
     """
     A class to handle currency conversion using an exchange rate API.
     """
-    def __init__(self, from_currency, to_currency):
+    def __init__(self, from_currency, to_currency, rate_table=None):
         """
         Initialize the ConvertCurrency class with from and to currencies.
 
         Args:
             from_currency (str): The currency code to convert from.
             to_currency (str): The currency code to convert to.
+            rate_table (ExchangeRateTable, optional): The source of exchange rates. Defaults to
+                                                      the process-wide exchange_rates table.
         """
         self.from_currency = from_currency
         self.to_currency = to_currency
+        self.rate_table = rate_table if rate_table is not None else exchange_rates
         self.valid_currencies = self.get_valid_currencies()
 
     def get_valid_currencies(self):
@@ -30,10 +194,7 @@ class ConvertCurrency:
         Returns:
             list: A list of valid currency codes.
         """
-        url = f"https://v6.exchangerate-api.com/v6/{API_KEY}/latest/USD"
-        response = requests.get(url)
-        data = response.json()
-        return data.get('conversion_rates').keys()
+        return self.rate_table.get_rates().keys()
 
     def is_valid_currency(self, currency):
         """
@@ -49,15 +210,14 @@ class ConvertCurrency:
 
     def get_currency_rates(self):
         """
-        Get the latest currency conversion rates from the exchange rate API.
+        Get the latest currency conversion rates from the exchange rate API, rounded for display.
+
+        Conversions use the full-precision rates from ExchangeRateTable.get_rate_matrix instead.
 
         Returns:
             dict: A dictionary with currency codes as keys and conversion rates as values.
         """
-        url = f'https://v6.exchangerate-api.com/v6/{API_KEY}/latest/USD'
-        response = requests.get(url)
-        data = response.json()
-        self.currencies = {key: round(value, 2) for key, value in data['conversion_rates'].items()}
+        self.currencies = {key: round(value, 2) for key, value in self.rate_table.get_rates().items()}
         return self.currencies
 
     def convert_currency(self, amount):
@@ -68,13 +228,39 @@ class ConvertCurrency:
             amount (float): The amount to convert.
 
         Returns:
-            float: The converted amount.
+            float: The converted amount, or None if either currency is unknown.
         """
-        if not hasattr(self, 'currencies'):
-            self.get_currency_rates()
-        from_currency_rate = self.currencies.get(self.from_currency)
-        to_currency_rate = self.currencies.get(self.to_currency)
-        if from_currency_rate is None or to_currency_rate is None:
+        cross_rate = self.get_cross_rate()
+        if cross_rate is None:
             return None
-        converted_amount = (amount / from_currency_rate) * to_currency_rate
+        converted_amount = amount * cross_rate
         return converted_amount
+
+    def get_cross_rate(self):
+        """
+        Get the full-precision rate from the from_currency to the to_currency.
+
+        Returns:
+            float: The amount of to_currency one unit of from_currency buys, or None if
+                   either currency is unknown.
+        """
+        currency_index, rate_matrix = self.rate_table.get_rate_matrix()
+        if self.from_currency not in currency_index or self.to_currency not in currency_index:
+            return None
+        return float(rate_matrix[currency_index[self.from_currency], currency_index[self.to_currency]])
+
+    @metrics.timed('currency_convert_seconds', {'method': 'convert_many'})
+    def convert_many(self, amounts):
+        """
+        Convert many amounts from the from_currency to the to_currency in one vectorized call.
+
+        Args:
+            amounts (array_like): The amounts to convert.
+
+        Returns:
+            numpy.ndarray: The converted amounts as float64, or None if either currency is unknown.
+        """
+        cross_rate = self.get_cross_rate()
+        if cross_rate is None:
+            return None
+        return np.asarray(amounts, dtype=np.float64) * cross_rate
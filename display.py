@@ -54,14 +54,18 @@ def print_with_delay(text, delay):
     print()  # Move to the next line after printing the text
 
 
-def welcome_message(file_path):
+def welcome_message(file_path, animate=True):
     """
     Print a welcome message with ASCII art.
 
     Args:
         file_path (str): The path to the file containing the ASCII art.
+        animate (bool, optional): Type the greeting out one character at a time. Defaults to True.
     """
-    print_with_delay("Welcome to\n", 0.05)
+    if animate:
+        print_with_delay("Welcome to\n", 0.05)
+    else:
+        print("Welcome to\n")
     print_ascii_art(file_path)
     print("")
 
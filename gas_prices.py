@@ -0,0 +1,143 @@
+import hashlib
+import json
+import threading
+import time
+
+
+GAS_PRICES_URL = "https://gasprices.aaa.com/state-gas-price-averages/"
+
+
+class GasPriceSnapshot:
+    """
+    An immutable set of gas prices per state and grade, fetched at a single point in time.
+    """
+    def __init__(self, prices, fetched_at=None, url=GAS_PRICES_URL):
+        """
+        Initialize the GasPriceSnapshot class.
+
+        Args:
+            prices (dict): States mapped to a dictionary of gas grade to price per gallon.
+                           Prices may be floats or scraped strings; strings that are not
+                           numbers are dropped.
+            fetched_at (float, optional): Unix time the prices were fetched. Defaults to now.
+            url (str, optional): The URL the prices were scraped from.
+        """
+        self.prices = {}
+        for state, grades in prices.items():
+            self.prices[state] = {}
+            for grade, price in grades.items():
+                try:
+                    self.prices[state][grade] = float(price)
+                except (TypeError, ValueError):
+                    continue
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        self.url = url
+        self.version = hashlib.sha1(json.dumps(self.prices, sort_keys=True).encode()).hexdigest()[:12]
+
+    def get_price(self, state, grade):
+        """
+        Get the price per gallon of a gas grade in a state.
+
+        Args:
+            state (str): The state.
+            grade (str): The gas grade (e.g. 'Regular', 'MidGrade', 'Premium', 'Diesel').
+
+        Returns:
+            float: The price per gallon, or None if there is no price for that state and grade.
+        """
+        return self.prices.get(state, {}).get(grade)
+
+    def age(self):
+        """
+        Get how old the snapshot is.
+
+        Returns:
+            float: Seconds since the prices were fetched.
+        """
+        return time.time() - self.fetched_at
+
+    def to_dict(self):
+        """
+        Convert the snapshot to a JSON-serializable dictionary.
+
+        Returns:
+            dict: Contains the version, fetch time, source URL and prices.
+        """
+        return {'version': self.version, 'fetched_at': self.fetched_at, 'url': self.url, 'prices': self.prices}
+
+    def save(self, file_path):
+        """
+        Write the snapshot to a JSON file.
+
+        Args:
+            file_path (str): The path of the file to write.
+        """
+        with open(file_path, 'w') as file:
+            json.dump(self.to_dict(), file)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Read a snapshot previously written with save().
+
+        Args:
+            file_path (str): The path of the snapshot file.
+
+        Returns:
+            GasPriceSnapshot: The loaded snapshot.
+        """
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+        return cls(data['prices'], fetched_at=data['fetched_at'], url=data['url'])
+
+
+class GasPriceStore:
+    """
+    Shares one gas price snapshot across all calculations, refreshing it at most once per interval.
+    """
+    def __init__(self, scraper, refresh_interval=60 * 60):
+        """
+        Initialize the GasPriceStore class.
+
+        Args:
+            scraper (Scraper): The scraper used to fetch gas prices.
+            refresh_interval (float, optional): Seconds before a snapshot is fetched again.
+                                                Defaults to one hour.
+        """
+        self.scraper = scraper
+        self.refresh_interval = refresh_interval
+        self.pinned = None
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def get_snapshot(self, url=GAS_PRICES_URL):
+        """
+        Get the current gas price snapshot, fetching a new one if it is missing or stale.
+
+        Args:
+            url (str, optional): The URL to scrape for gas prices. Defaults to GAS_PRICES_URL.
+
+        Returns:
+            GasPriceSnapshot: The pinned snapshot if there is one, otherwise the latest
+                              snapshot for the URL, or None if fetching failed.
+        """
+        if self.pinned is not None:
+            return self.pinned
+        with self._lock:
+            snapshot = self._snapshots.get(url)
+            if snapshot is None or snapshot.age() > self.refresh_interval:
+                # Cached prices older than the refresh interval would make a stale snapshot
+                gas_prices, fetched_at = self.scraper.get_gas_prices_with_time(url, self.refresh_interval)
+                if gas_prices is not None:
+                    snapshot = GasPriceSnapshot(gas_prices, fetched_at=fetched_at, url=url)
+                    self._snapshots[url] = snapshot
+            return snapshot
+
+    def pin(self, snapshot):
+        """
+        Use a fixed snapshot for every calculation instead of fetching, e.g. for batch jobs.
+
+        Args:
+            snapshot (GasPriceSnapshot): The snapshot to use, or None to resume fetching.
+        """
+        self.pinned = snapshot
@@ -0,0 +1,255 @@
+import argparse
+import datetime
+import gzip
+import json
+import re
+import threading
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import requote_uri
+
+
+# Patterns replaced in URLs before they are used as archive keys, so secrets such as the
+# exchange rate API key are never written to an archive and any key replays the same response
+DEFAULT_REDACTIONS = [
+    (r'(exchangerate-api\.com/v6/)[^/]+', r'\1API_KEY'),
+]
+
+
+class NotRecordedError(requests.ConnectionError):
+    """
+    Raised when replaying a request whose response is not in the archive.
+    """
+
+
+class ResponseArchive:
+    """
+    HTTP responses recorded from the live sites, replayed from memory without any network access.
+
+    In 'record' mode every response fetched through the archive's adapter is kept, and
+    save() writes them all to a gzip-compressed JSON file. In 'replay' mode responses are
+    served from the loaded archive, so runs are fast and reproducible on isolated machines.
+    """
+    def __init__(self, mode='replay', redactions=None):
+        """
+        Initialize the ResponseArchive class with no responses.
+
+        Args:
+            mode (str, optional): Either 'record' or 'replay'. Defaults to 'replay'.
+            redactions (list, optional): (regex, replacement) pairs applied to URLs before
+                                         they are used as keys. Defaults to DEFAULT_REDACTIONS.
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown archive mode: {mode}")
+        self.mode = mode
+        self.redactions = [(re.compile(pattern), replacement)
+                           for pattern, replacement in (redactions or DEFAULT_REDACTIONS)]
+        self.responses = {}
+        self._lock = threading.Lock()
+
+    def get_key(self, url):
+        """
+        Get the archive key of a URL, with any secrets redacted.
+
+        URLs are percent-encoded the way requests sends them, so a raw URL such as
+        '.../camry hybrid' from AsyncScraper has the same key as the prepared request
+        '.../camry%20hybrid' recorded through the adapters.
+
+        Args:
+            url (str): The requested URL.
+
+        Returns:
+            str: The key the response is stored under.
+        """
+        url = requote_uri(url)
+        for pattern, replacement in self.redactions:
+            url = pattern.sub(replacement, url)
+        return url
+
+    def record(self, url, status, reason, content_type, body):
+        """
+        Store a response, replacing any earlier one for the same URL.
+
+        Args:
+            url (str): The requested URL.
+            status (int): The HTTP status code.
+            reason (str): The HTTP reason phrase.
+            content_type (str): The Content-Type header, or None.
+            body (bytes or str): The response body. Text is stored as UTF-8.
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        with self._lock:
+            self.responses[self.get_key(url)] = (status, reason, content_type, body)
+
+    def get(self, url):
+        """
+        Look up a recorded response.
+
+        Args:
+            url (str): The requested URL.
+
+        Returns:
+            tuple: Contains the status code, reason, content type and body bytes, or None if
+                   the URL was never recorded.
+        """
+        return self.responses.get(self.get_key(url))
+
+    def get_text(self, url):
+        """
+        Get the body of a successful recorded response as text.
+
+        Args:
+            url (str): The requested URL.
+
+        Returns:
+            str: The body, or None if the URL was never recorded or returned an error status.
+        """
+        response = self.get(url)
+        if response is None or response[0] >= 400:
+            return None
+        return response[3].decode(get_charset(response[2]), errors='replace')
+
+    def get_adapter(self, pool_size=10):
+        """
+        Get a requests transport adapter that records into or replays from this archive.
+
+        Args:
+            pool_size (int, optional): Connections kept open per host while recording. Defaults to 10.
+
+        Returns:
+            requests.adapters.BaseAdapter: The adapter to mount on a session.
+        """
+        if self.mode == 'record':
+            return RecordingAdapter(self, pool_connections=pool_size, pool_maxsize=pool_size)
+        return ReplayAdapter(self)
+
+    def save(self, file_path):
+        """
+        Write every recorded response to a gzip-compressed JSON file.
+
+        Args:
+            file_path (str): The path of the archive to write, e.g. 'responses.json.gz'.
+        """
+        with self._lock:
+            data = {
+                url: {'status': status, 'reason': reason, 'content_type': content_type,
+                      'body': body.decode('utf-8', errors='surrogateescape')}
+                for url, (status, reason, content_type, body) in self.responses.items()
+            }
+        with gzip.open(file_path, 'wt', encoding='utf-8', errors='surrogateescape') as file:
+            json.dump({'version': 1, 'responses': data}, file)
+
+    @classmethod
+    def load(cls, file_path, mode='replay', redactions=None):
+        """
+        Read an archive previously written by save() into memory.
+
+        Args:
+            file_path (str): The path of the archive.
+            mode (str, optional): Either 'record', to add to the archive, or 'replay'. Defaults to 'replay'.
+            redactions (list, optional): As for ResponseArchive. Defaults to DEFAULT_REDACTIONS.
+
+        Returns:
+            ResponseArchive: The loaded archive.
+        """
+        with gzip.open(file_path, 'rt', encoding='utf-8', errors='surrogateescape') as file:
+            data = json.load(file)
+        archive = cls(mode, redactions)
+        for url, response in data['responses'].items():
+            archive.responses[url] = (
+                response['status'], response['reason'], response['content_type'],
+                response['body'].encode('utf-8', errors='surrogateescape'),
+            )
+        return archive
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    A requests adapter that sends requests to the network and records every response.
+    """
+    def __init__(self, archive, **kwargs):
+        self.archive = archive
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.archive.record(request.url, response.status_code, response.reason,
+                            response.headers.get('Content-Type'), response.content)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    A requests adapter that answers every request from an archive, never touching the network.
+    """
+    def __init__(self, archive):
+        self.archive = archive
+        super().__init__()
+
+    def send(self, request, **kwargs):
+        recorded = self.archive.get(request.url)
+        if recorded is None:
+            raise NotRecordedError(f"No recorded response for {request.url}", request=request)
+        status, reason, content_type, body = recorded
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict({'Content-Type': content_type} if content_type else {})
+        response.encoding = get_charset(content_type)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = datetime.timedelta(0)
+        return response
+
+    def close(self):
+        pass
+
+
+def get_charset(content_type):
+    """
+    Get the character set of a Content-Type header.
+
+    Args:
+        content_type (str): The header value, or None.
+
+    Returns:
+        str: The charset it names, or 'utf-8'.
+    """
+    match = re.search(r'charset=([\w.:-]+)', content_type or '', re.IGNORECASE)
+    return match.group(1) if match else 'utf-8'
+
+
+def main(argv=None):
+    """
+    Record the gas prices, exchange rates and catalog pages into an archive for offline replay.
+    """
+    from gas_prices import GAS_PRICES_URL
+    from currency_converter import ExchangeRateTable
+    from scraper import Scraper
+    from vehicle_catalog import vehicle_catalog
+
+    parser = argparse.ArgumentParser(description="Record live responses into an archive for offline replay.")
+    parser.add_argument('archive', help="Archive file to write, e.g. responses.json.gz")
+    parser.add_argument('--makes', nargs='*', help="Only record these makes. Defaults to every make.")
+    parser.add_argument('--mileages', nargs='*', type=int, help="Mileages to record maintenance costs for. "
+                                                              "Defaults to the catalog's mileages.")
+    parser.add_argument('--append', action='store_true', help="Add to an existing archive instead of replacing it")
+    args = parser.parse_args(argv)
+
+    archive = ResponseArchive.load(args.archive, mode='record') if args.append else ResponseArchive('record')
+    # No cache, so every response really is fetched and recorded
+    with Scraper(archive=archive) as scraper:
+        scraper.get_gas_prices(GAS_PRICES_URL)
+        scraper.prefetch_catalog(vehicle_catalog.details, makes=args.makes, mileages=args.mileages)
+    ExchangeRateTable(archive=archive).get_rates()
+    archive.save(args.archive)
+    print(f"Recorded {len(archive.responses)} responses to {args.archive}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import functools
+import json
+import threading
+import time
+
+
+class Timer:
+    """
+    A context manager recording how long its block took into a Metrics registry.
+    """
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+
+    def __init__(self, metrics, name, labels=None):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        if self.metrics.enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.start is not None:
+            self.metrics.observe(self.name, time.perf_counter() - self.start, self.labels)
+
+
+class Metrics:
+    """
+    A thread-safe registry of counters and timers for the scraping and calculation hot paths.
+
+    Metrics are disabled by default, in which case every recording call returns after a
+    single attribute check. Names follow Prometheus conventions: counters end in _total
+    and timers in _seconds, and both can carry labels such as the data source.
+    """
+    def __init__(self, enabled=False):
+        """
+        Initialize the Metrics class.
+
+        Args:
+            enabled (bool, optional): Whether to record anything. Defaults to False.
+        """
+        self.enabled = enabled
+        self.counters = {}
+        self.timers = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """
+        Start recording metrics.
+        """
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stop recording metrics, keeping the values recorded so far.
+        """
+        self.enabled = False
+
+    def reset(self):
+        """
+        Forget every recorded counter and timer.
+        """
+        with self._lock:
+            self.counters = {}
+            self.timers = {}
+
+    def increment(self, name, value=1, labels=None):
+        """
+        Add to a counter.
+
+        Args:
+            name (str): The counter name, e.g. 'scraper_bytes_fetched_total'.
+            value (float, optional): The amount to add. Defaults to 1.
+            labels (dict, optional): Labels distinguishing this series, e.g. {'source': 'mpg'}.
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, labels=None):
+        """
+        Record one duration in a timer, which keeps the count, sum and maximum.
+
+        Args:
+            name (str): The timer name, e.g. 'scraper_fetch_seconds'.
+            seconds (float): The duration to record.
+            labels (dict, optional): Labels distinguishing this series.
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        with self._lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                self.timers[key] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    def timer(self, name, labels=None):
+        """
+        Time a block of code.
+
+        Args:
+            name (str): The timer name.
+            labels (dict, optional): Labels distinguishing this series.
+
+        Returns:
+            Timer: A context manager recording the duration of its block.
+        """
+        return Timer(self, name, labels)
+
+    def timed(self, name, labels=None):
+        """
+        Decorate a function so every call is recorded in a timer.
+
+        When metrics are disabled the wrapper calls straight through to the function.
+
+        Args:
+            name (str): The timer name.
+            labels (dict, optional): Labels distinguishing this series.
+
+        Returns:
+            callable: The decorator.
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start, labels)
+            return wrapper
+        return decorator
+
+    def to_dict(self):
+        """
+        Get every recorded metric as plain data.
+
+        Returns:
+            dict: Contains 'counters', a list of {'name', 'labels', 'value'}, and 'timers',
+                  a list of {'name', 'labels', 'count', 'sum', 'max'}.
+        """
+        with self._lock:
+            return self._to_dict(self.counters, self.timers)
+
+    @staticmethod
+    def _to_dict(counters, timers):
+        return {
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+            'timers': [
+                {'name': name, 'labels': dict(labels), 'count': count, 'sum': total, 'max': longest}
+                for (name, labels), (count, total, longest) in sorted(timers.items())
+            ],
+        }
+
+    def merge(self, data):
+        """
+        Add metrics recorded elsewhere, such as in a worker process, to this registry.
+
+        Args:
+            data (dict): Metrics as returned by to_dict().
+        """
+        with self._lock:
+            for counter in data['counters']:
+                key = (counter['name'], tuple(sorted(counter['labels'].items())))
+                self.counters[key] = self.counters.get(key, 0) + counter['value']
+            for timer in data['timers']:
+                key = (timer['name'], tuple(sorted(timer['labels'].items())))
+                current = self.timers.get(key)
+                if current is None:
+                    self.timers[key] = [timer['count'], timer['sum'], timer['max']]
+                else:
+                    current[0] += timer['count']
+                    current[1] += timer['sum']
+                    current[2] = max(current[2], timer['max'])
+
+    def collect(self):
+        """
+        Get every recorded metric and reset the registry, for shipping deltas between processes.
+
+        Returns:
+            dict: Metrics as returned by to_dict().
+        """
+        with self._lock:
+            counters, timers = self.counters, self.timers
+            self.counters, self.timers = {}, {}
+        return self._to_dict(counters, timers)
+
+    def to_json(self):
+        """
+        Format every recorded metric as JSON.
+
+        Returns:
+            str: The metrics, as returned by to_dict().
+        """
+        return json.dumps(self.to_dict(), indent=4)
+
+    def to_prometheus(self):
+        """
+        Format every recorded metric in the Prometheus text exposition format.
+
+        Counters are exported as counters, and timers as summaries (_count and _sum)
+        alongside a separate _max_seconds gauge.
+
+        Returns:
+            str: The metrics, one sample per line.
+        """
+        data = self.to_dict()
+        lines = []
+        typed = set()
+
+        def add_sample(name, metric_type, labels, value):
+            if name not in typed:
+                lines.append(f"# TYPE {name} {metric_type}")
+                typed.add(name)
+            lines.append(f"{name}{format_labels(labels)} {value}")
+
+        for counter in data['counters']:
+            add_sample(counter['name'], 'counter', counter['labels'], counter['value'])
+        for timer in data['timers']:
+            name = timer['name']
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            lines.append(f"{name}_count{format_labels(timer['labels'])} {timer['count']}")
+            lines.append(f"{name}_sum{format_labels(timer['labels'])} {timer['sum']:.9f}")
+        for timer in data['timers']:
+            max_name = timer['name'].removesuffix('_seconds') + '_max_seconds'
+            add_sample(max_name, 'gauge', timer['labels'], f"{timer['max']:.9f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path):
+        """
+        Write every recorded metric to a file, as JSON if it ends in .json and in the
+        Prometheus text format otherwise (e.g. a .prom file for the node exporter).
+
+        Args:
+            file_path (str): The path of the file to write.
+        """
+        with open(file_path, 'w') as file:
+            file.write(self.to_json() if file_path.lower().endswith('.json') else self.to_prometheus())
+
+
+def format_labels(labels):
+    """
+    Format labels for the Prometheus text format.
+
+    Args:
+        labels (dict): Label names mapped to values.
+
+    Returns:
+        str: The labels in braces, or an empty string if there are none.
+    """
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+metrics = Metrics()
@@ -1,23 +1,92 @@
-from calculator import VehicleCostCalculator
-from currency_converter import ConvertCurrency
-from scraper import Scraper
+from gas_prices import GAS_PRICES_URL
 from display import display_menu, welcome_message, load_menu, exit_message
 from keydetection_screenclearing import on_key_event, clear_screen
-import keyboard
+from instrumentation import metrics
+from dotenv import load_dotenv
+import argparse
+import atexit
+import os
+import threading
 
+# The calculator, scraper, currency and keyboard modules pull in requests, bs4, numpy and
+# aiohttp, which take far longer to import than it takes to show the first prompt. They are
+# imported where they are used, and warmed up by start_background_loading.
 
-def main():
+
+def start_background_loading():
+    """
+    Import the heavy modules and fetch the exchange rates on a background thread.
+
+    This runs while the user reads the welcome screen. Imports made later from the main
+    thread wait for this thread instead of starting over, and ConvertCurrency waits for the
+    rates that are already being fetched.
+
+    Returns:
+        threading.Thread: The started daemon thread.
+    """
+    def load():
+        try:
+            from currency_converter import exchange_rates
+            exchange_rates.get_rates()
+        except Exception:
+            pass  # ConvertCurrency fetches the rates again and reports the error
+        import calculator
+        import comparison
+        import keyboard
+
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+
+def configure_from_environment():
+    """
+    Turn on metrics and the response archive if they are configured in the environment or .env.
+    """
+    # Setting METRICS_FILE (e.g. in .env) records timings and counters and writes them on exit
+    metrics_file = os.getenv('METRICS_FILE')
+    if metrics_file:
+        metrics.enable()
+        atexit.register(metrics.write, metrics_file)
+
+    # Setting HTTP_ARCHIVE replays web responses from that archive, or records them with HTTP_ARCHIVE_MODE=record
+    archive_file = os.getenv('HTTP_ARCHIVE')
+    if archive_file:
+        from calculator import scraper
+        from currency_converter import exchange_rates
+        from http_archive import ResponseArchive
+        archive_mode = os.getenv('HTTP_ARCHIVE_MODE', 'replay')
+        if archive_mode == 'replay' or os.path.exists(archive_file):
+            archive = ResponseArchive.load(archive_file, archive_mode)
+        else:
+            archive = ResponseArchive(archive_mode)
+        scraper.use_archive(archive)
+        exchange_rates.use_archive(archive)
+        if archive_mode == 'record':
+            atexit.register(archive.save, archive_file)
+
+
+def main(argv=None):
     """
     Main function to run the vehicle cost calculator program.
 
     This function displays a welcome message, prompts the user for preferred
     currency, and provides a menu for calculating vehicle costs, including loan
-    payments, gas costs, and maintenance costs. It also allows comparing two vehicles.
+    payments, gas costs, and maintenance costs. It also allows comparing several vehicles.
     """
-    welcome_message('ascii_title.txt')
+    parser = argparse.ArgumentParser(description="Calculate and compare the costs of owning a vehicle.")
+    parser.add_argument('--no-animation', action='store_true', help="Show the welcome screen without the typing animation")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    configure_from_environment()
+    start_background_loading()
+
+    welcome_message('ascii_title.txt', animate=not args.no_animation)
 
     input("Press Enter to continue...")
     clear_screen()
+    from currency_converter import ConvertCurrency
     converter = None
 
     # Loop until a valid currency is entered
@@ -33,8 +102,9 @@ def main():
     input("Press Enter to continue...")
     clear_screen()
 
+    from calculator import VehicleCostCalculator
+    import keyboard
     calculator = VehicleCostCalculator()
-    scraper = Scraper()
     menu = load_menu('menu.json')
 
     keyboard.hook(on_key_event)
@@ -57,7 +127,7 @@ def main():
                 handle_maintenance_cost(calculator, converter)
                 clear_screen()
             case '4':
-                handle_vehicle_comparison(calculator, converter, scraper)
+                handle_vehicle_comparison(calculator, converter)
                 clear_screen()
             case _:
                 print("\nInvalid choice. Please try again.\n")
@@ -89,7 +159,7 @@ def handle_gas_cost(calculator, converter):
     make, model, mileage = calculator.get_vehicle_info(1)
     clear_screen()
     while True:
-        gas_prices_url = 'https://gasprices.aaa.com/state-gas-price-averages/'
+        gas_prices_url = GAS_PRICES_URL
         state, gas_grade = calculator.get_gas_prices_info()
         clear_screen()
         monthly_gas_cost = calculator.calculate_monthly_gas_cost(make, model, mileage, state, gas_grade, gas_prices_url)
@@ -119,102 +189,68 @@ def handle_maintenance_cost(calculator, converter):
     clear_screen()
 
 
-def handle_vehicle_comparison(calculator, converter, scraper):
+def handle_vehicle_comparison(calculator, converter):
     """
-    Handle the comparison of two vehicles.
+    Handle the comparison of two or more vehicles.
 
-    Prompts the user for financial and vehicle information for two vehicles and compares their costs.
+    Prompts the user for financial and vehicle information for each vehicle, fetches
+    their data concurrently and ranks them by total monthly cost.
     """
-    gas_prices_url = "https://gasprices.aaa.com/state-gas-price-averages/"
-    
-    clear_screen()
-    # Gather details for Vehicle 1
-    print("\nEnter details for Vehicle 1:")
-    financial_info_1 = calculator.get_financial_info()
-    clear_screen()
-    make_1, model_1, mileage_1 = calculator.get_vehicle_info(1)
-    clear_screen()
-    state_1, gas_grade_1 = calculator.get_gas_prices_info()
-    clear_screen()
-
-    clear_screen()
-    # Gather details for Vehicle 2
-    print("\nEnter details for Vehicle 2:")
-    financial_info_2 = calculator.get_financial_info()
-    clear_screen()
-    make_2, model_2, mileage_2 = calculator.get_vehicle_info(2)
-    clear_screen()
-    state_2, gas_grade_2 = calculator.get_gas_prices_info()
     clear_screen()
+    while True:
+        vehicle_count = calculator.get_valid_int("How many vehicles would you like to compare? ")
+        if vehicle_count >= 2:
+            break
+        print("Please compare at least 2 vehicles.")
 
-    clear_screen()
-    # Display the input data
-    print("\nUser Input Data:")
-    print(f"Vehicle 1: {make_1} {model_1}, Mileage: {mileage_1}, State: {state_1}, Gas Grade: {gas_grade_1}")
-    print(f"Financial Info 1: Purchase Price: {financial_info_1[0]}, Loan Interest Rate: {financial_info_1[1]}, Loan Term (years): {financial_info_1[2]}, Down Payment Amount: {financial_info_1[3]}")
-    print(f"Vehicle 2: {make_2} {model_2}, Mileage: {mileage_2}, State: {state_2}, Gas Grade: {gas_grade_2}")
-    print(f"Financial Info 2: Purchase Price: {financial_info_2[0]}, Loan Interest Rate: {financial_info_2[1]}, Loan Term (years): {financial_info_2[2]}, Down Payment Amount: {financial_info_2[3]}")
-    clear_screen()
+    scenarios = []
+    for vehicle_number in range(1, vehicle_count + 1):
+        clear_screen()
+        # Gather details for each vehicle
+        print(f"\nEnter details for Vehicle {vehicle_number}:")
+        purchase_price, loan_interest_rate, loan_term_years, down_payment_amount = calculator.get_financial_info()
+        clear_screen()
+        make, model, mileage = calculator.get_vehicle_info(vehicle_number)
+        clear_screen()
+        state, gas_grade = calculator.get_gas_prices_info()
+        scenarios.append({
+            'vehicle_number': vehicle_number, 'make': make, 'model': model, 'mileage': mileage,
+            'state': state, 'gas_grade': gas_grade, 'purchase_price': purchase_price,
+            'loan_interest_rate': loan_interest_rate, 'loan_term_years': loan_term_years,
+            'down_payment_amount': down_payment_amount,
+        })
 
     clear_screen()
-    # Calculate costs for Vehicle 1
-    print("\nCalculating costs for Vehicle 1...")
-    monthly_costs_1 = calculator.calculate_total_costs(
-        make_1, model_1, mileage_1, state_1, gas_grade_1,
-        financial_info_1, 
-        scraper.get_maintenance_costs(make_1, model_1, mileage_1),
-        gas_prices_url
-    )
-
-    # Calculate costs for Vehicle 2
-    print("\nCalculating costs for Vehicle 2...")
-    monthly_costs_2 = calculator.calculate_total_costs(
-        make_2, model_2, mileage_2, state_2, gas_grade_2,
-        financial_info_2, 
-        scraper.get_maintenance_costs(make_2, model_2, mileage_2),
-        gas_prices_url
-    )
-
-    total_cost_1 = monthly_costs_1['total_monthly_cost']
-    total_cost_2 = monthly_costs_2['total_monthly_cost']
+    print("\nCalculating costs...")
+    from comparison import compare_vehicles
+    results = compare_vehicles(scenarios, GAS_PRICES_URL)
     clear_screen()
 
-    clear_screen()
-    # Display the summary of calculated costs
+    # Display the summary of calculated costs, cheapest first
     print("\nSummary of Calculated Costs:")
-    print(f"Vehicle 1: {make_1} {model_1}")
-    print(f"  Monthly Loan Payment: {converter.convert_currency(monthly_costs_1['monthly_loan_payment']):.2f} {converter.to_currency}")
-    print(f"  Monthly Gas Cost: {converter.convert_currency(monthly_costs_1['monthly_gas_cost']):.2f} {converter.to_currency}")
-    print(f"  Monthly Repair and Maintenance Cost: {converter.convert_currency(monthly_costs_1['monthly_repair_maintenance_cost']):.2f} {converter.to_currency}")
-    print(f"  Total Monthly Cost: {converter.convert_currency(total_cost_1):.2f} {converter.to_currency}")
-
-    print(f"\nVehicle 2: {make_2} {model_2}")
-    print(f"  Monthly Loan Payment: {converter.convert_currency(monthly_costs_2['monthly_loan_payment']):.2f} {converter.to_currency}")
-    print(f"  Monthly Gas Cost: {converter.convert_currency(monthly_costs_2['monthly_gas_cost']):.2f} {converter.to_currency}")
-    print(f"  Monthly Repair and Maintenance Cost: {converter.convert_currency(monthly_costs_2['monthly_repair_maintenance_cost']):.2f} {converter.to_currency}")
-    print(f"  Total Monthly Cost: {converter.convert_currency(total_cost_2):.2f} {converter.to_currency}")
+    for result in results:
+        print(f"\n{result['rank']}. Vehicle {result['vehicle_number']}: {result['make']} {result['model']}")
+        for field, label in [('monthly_loan_payment', "Monthly Loan Payment"),
+                             ('monthly_gas_cost', "Monthly Gas Cost"),
+                             ('monthly_repair_maintenance_cost', "Monthly Repair and Maintenance Cost"),
+                             ('total_monthly_cost', "Total Monthly Cost")]:
+            if result[field] is None:
+                print(f"  {label}: unavailable")
+            else:
+                print(f"  {label}: {converter.convert_currency(result[field]):.2f} {converter.to_currency}")
 
     # Provide recommendation based on total cost
-    if total_cost_1 < total_cost_2:
-        reason = "Vehicle 1 is more cost-effective."
-        if monthly_costs_1['monthly_gas_cost'] < monthly_costs_2['monthly_gas_cost']:
-            reason += " Gas cost is less."
-        if monthly_costs_1['monthly_repair_maintenance_cost'] < monthly_costs_2['monthly_repair_maintenance_cost']:
-            reason += " Maintenance cost is less."
+    best = results[0]
+    if best['total_monthly_cost'] is None:
+        print("\nRecommendation: Not enough data to compare these vehicles.")
     else:
-        reason = "Vehicle 2 is more cost-effective."
-        if monthly_costs_2['monthly_gas_cost'] < monthly_costs_1['monthly_gas_cost']:
-            reason += " Gas cost is less."
-        if monthly_costs_2['monthly_repair_maintenance_cost'] < monthly_costs_1['monthly_repair_maintenance_cost']:
-            reason += " Maintenance cost is less."
-
-    print("\nRecommendation:", reason)
+        reason = f"Vehicle {best['vehicle_number']} is the most cost-effective."
+        for field, label in [('monthly_gas_cost', "Gas"), ('monthly_repair_maintenance_cost', "Maintenance")]:
+            others = [result[field] for result in results[1:] if result[field] is not None]
+            if best[field] is not None and all(best[field] < other for other in others):
+                reason += f" {label} cost is the lowest."
+        print("\nRecommendation:", reason)
 
-    if total_cost_1 < total_cost_2:
-        print("However, the overall cost of Vehicle 1 is higher.")
-    else:
-        print("However, the overall cost of Vehicle 2 is higher.")
-    
     input("Press Enter to continue...")
     clear_screen()
 
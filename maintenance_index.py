@@ -0,0 +1,204 @@
+import asyncio
+import bisect
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from vehicle_catalog import vehicle_catalog
+
+
+class MaintenanceIndex:
+    """
+    Maintenance cost curves per make, model and mileage bucket, interpolated for any mileage.
+
+    caredge prices maintenance by annual mileage, so scraping the exact mileage of every
+    user makes nearly every request a distinct, uncached fetch. The index only ever fetches
+    the bucket mileages listed in vehicle_details.json and interpolates linearly between
+    the two buckets around a mileage, so once the buckets of a vehicle are loaded (for
+    example by Scraper.prefetch_catalog) any mileage within their range is answered from
+    local data. Outside the range, buckets continue at the same spacing, so every mileage
+    still maps onto a few shared pages. Curves are kept in memory up to max_curves, least
+    recently used first out.
+    """
+    def __init__(self, scraper, buckets=None, max_curves=10000):
+        """
+        Initialize the MaintenanceIndex class.
+
+        Args:
+            scraper (Scraper): The scraper fetching the curve of each bucket.
+            buckets (list, optional): The bucket mileages. Defaults to the catalog's "Mileage" list.
+            max_curves (int, optional): Maximum number of bucket curves kept in memory. Defaults to 10000.
+        """
+        self.scraper = scraper
+        self._buckets = sorted(buckets) if buckets else None
+        self.max_curves = max_curves
+        self._curves = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_buckets(self):
+        """
+        Get the bucket mileages.
+
+        Returns:
+            list: The mileages, in ascending order.
+        """
+        if self._buckets is None:
+            self._buckets = sorted(vehicle_catalog.get_mileages())
+        return self._buckets
+
+    def get_bucket_weights(self, mileage):
+        """
+        Find the buckets around a mileage and how far between them it lies.
+
+        Outside the range of the bucket mileages, buckets continue at the spacing of the
+        first or last two, e.g. 22500 and 24000 above a last bucket of 21000. Mileages
+        below the lowest positive bucket of that spacing use that bucket.
+
+        Args:
+            mileage (float): The miles driven annually.
+
+        Returns:
+            tuple: Contains the lower bucket, the upper bucket and the weight of the upper
+                   bucket between 0 and 1. Both buckets are the same if the mileage is on one.
+        """
+        buckets = self.get_buckets()
+        if mileage < buckets[0] or mileage > buckets[-1]:
+            return self._get_extended_bucket_weights(buckets, mileage)
+        if mileage == buckets[-1]:
+            return buckets[-1], buckets[-1], 0.0
+        index = bisect.bisect_right(buckets, mileage)
+        lower, upper = buckets[index - 1], buckets[index]
+        if mileage == lower:
+            return lower, lower, 0.0
+        return lower, upper, (mileage - lower) / (upper - lower)
+
+    def _get_extended_bucket_weights(self, buckets, mileage):
+        if len(buckets) == 1:
+            origin = step = buckets[0]
+        elif mileage > buckets[-1]:
+            origin, step = buckets[-1], buckets[-1] - buckets[-2]
+        else:
+            origin, step = buckets[0], buckets[1] - buckets[0]
+        lower = origin + math.floor((mileage - origin) / step) * step
+        upper = lower + step
+        if lower <= 0:
+            return upper, upper, 0.0
+        if mileage == lower:
+            return lower, lower, 0.0
+        return lower, upper, (mileage - lower) / step
+
+    def store_curve(self, make, model, bucket, curve):
+        """
+        Keep the cost curve of a bucket in memory.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            bucket (int): The bucket mileage.
+            curve (list): The annual maintenance costs, as returned by
+                          Scraper.get_maintenance_cost_curve, or None if it failed.
+
+        Returns:
+            numpy.ndarray: The curve as float64, or None if it failed.
+        """
+        if curve is None:
+            return None
+        curve = np.array(curve, dtype=np.float64)
+        with self._lock:
+            self._curves[(make, model, bucket)] = curve
+            self._curves.move_to_end((make, model, bucket))
+            while len(self._curves) > self.max_curves:
+                self._curves.popitem(last=False)
+        return curve
+
+    def get_bucket_curve(self, make, model, bucket, fetch=True):
+        """
+        Get the cost curve of one bucket, scraping it if it is not in memory yet.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            bucket (int): The bucket mileage.
+            fetch (bool, optional): Whether to scrape a curve that is not in memory. Defaults to True.
+
+        Returns:
+            numpy.ndarray: The float64 annual costs of years 1, 2, ..., or None if failed.
+        """
+        with self._lock:
+            curve = self._curves.get((make, model, bucket))
+            if curve is not None:
+                self._curves.move_to_end((make, model, bucket))
+        if curve is None and fetch:
+            curve = self.store_curve(make, model, bucket,
+                                     self.scraper.get_maintenance_cost_curve(make, model, bucket))
+        return curve
+
+    async def fetch_bucket_curves(self, async_scraper, make, model, mileage):
+        """
+        Concurrently scrape the bucket curves a mileage needs that are not in memory yet.
+
+        Args:
+            async_scraper (AsyncScraper): The scraper used for the maintenance pages.
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            mileage (float): The miles driven annually.
+        """
+        if mileage is None or not math.isfinite(mileage):
+            return
+        lower, upper, _ = self.get_bucket_weights(mileage)
+        buckets = [bucket for bucket in {lower, upper} if (make, model, bucket) not in self._curves]
+        curves = await asyncio.gather(*(
+            async_scraper.get_maintenance_cost_curve(make, model, bucket) for bucket in buckets
+        ))
+        for bucket, curve in zip(buckets, curves):
+            self.store_curve(make, model, bucket, curve)
+
+    def get_curve(self, make, model, mileage, fetch=True):
+        """
+        Get the maintenance cost curve of a vehicle at any mileage.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            mileage (float): The miles driven annually.
+            fetch (bool, optional): Whether to scrape buckets that are not in memory with the
+                                    blocking scraper. Coroutines pass False after
+                                    fetch_bucket_curves, so a failed fetch is not retried on
+                                    the event loop. Defaults to True.
+
+        Returns:
+            numpy.ndarray: The float64 annual costs of years 1, 2, ..., interpolated between the
+                           buckets around the mileage, or None if neither could be scraped.
+        """
+        if mileage is None or not math.isfinite(mileage):
+            return None
+        lower, upper, weight = self.get_bucket_weights(mileage)
+        lower_curve = self.get_bucket_curve(make, model, lower, fetch)
+        if weight == 0:
+            return lower_curve
+        upper_curve = self.get_bucket_curve(make, model, upper, fetch)
+        if lower_curve is None or upper_curve is None:
+            return upper_curve if lower_curve is None else lower_curve
+        years = min(len(lower_curve), len(upper_curve))
+        return lower_curve[:years] + (upper_curve[:years] - lower_curve[:years]) * weight
+
+    def get_maintenance_costs(self, make, model, mileage, fetch=True):
+        """
+        Get the first-year maintenance cost of a vehicle at any mileage.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            mileage (float): The miles driven annually.
+            fetch (bool, optional): Whether to scrape buckets that are not in memory, as for
+                                    get_curve(). Defaults to True.
+
+        Returns:
+            float: The interpolated first-year cost, or None if it is not available.
+        """
+        curve = self.get_curve(make, model, mileage, fetch)
+        if curve is None or len(curve) == 0 or math.isnan(curve[0]):
+            return None
+        return float(curve[0])
@@ -0,0 +1,159 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calculator import VehicleCostCalculator, scraper, gas_price_store, maintenance_index
+from gas_prices import GAS_PRICES_URL
+
+
+# Spread of each uncertain input. Gas price and maintenance are log-normal with the given
+# sigma, mileage is normal with the given fraction of the base as standard deviation, and
+# the interest rate is normal with the given absolute standard deviation.
+DEFAULT_UNCERTAINTY = {
+    'gas_price': 0.15,
+    'mileage': 0.20,
+    'interest_rate': 0.01,
+    'maintenance': 0.25,
+}
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+COST_FIELDS = ['monthly_loan_payment', 'monthly_gas_cost', 'monthly_repair_maintenance_cost', 'total_monthly_cost']
+
+
+def sample_lognormal(rng, base, sigma, size):
+    """
+    Sample a log-normal distribution whose mean is the base value.
+
+    Args:
+        rng (numpy.random.Generator): The random number generator.
+        base (float): The mean of the distribution.
+        sigma (float): The standard deviation of the underlying normal distribution.
+        size (int): The number of samples.
+
+    Returns:
+        numpy.ndarray: The samples.
+    """
+    return base * np.exp(rng.standard_normal(size) * sigma - sigma ** 2 / 2)
+
+
+def simulate_chunk(scenario, uncertainty, paths, seed):
+    """
+    Simulate the monthly costs of a scenario along a number of random paths.
+
+    Args:
+        scenario (dict): The scenario, as described in simulate_total_costs.
+        uncertainty (dict): The spread of each input, as in DEFAULT_UNCERTAINTY.
+        paths (int): The number of paths to simulate.
+        seed (numpy.random.SeedSequence): The seed of this chunk.
+
+    Returns:
+        dict: Float64 arrays of sampled costs for every field in COST_FIELDS.
+    """
+    rng = np.random.default_rng(seed)
+    calculator = VehicleCostCalculator()
+
+    gas_prices = sample_lognormal(rng, scenario['gas_price'], uncertainty['gas_price'], paths)
+    mileages = scenario['mileage'] * (1 + rng.standard_normal(paths) * uncertainty['mileage'])
+    np.maximum(mileages, 0, out=mileages)
+    rates = scenario['loan_interest_rate'] + rng.standard_normal(paths) * uncertainty['interest_rate']
+    np.maximum(rates, 0, out=rates)
+    annual_maintenance_costs = sample_lognormal(
+        rng, scenario['annual_maintenance_cost'], uncertainty['maintenance'], paths
+    )
+
+    principal = scenario['purchase_price'] - (scenario.get('down_payment_amount') or 0)
+    monthly_loan_payments = calculator.calculate_monthly_loan_payments(principal, rates, scenario['loan_term_years'])
+    monthly_gas_costs = calculator.calculate_gas_cost(mileages, scenario['mpg'], gas_prices)
+    monthly_repair_maintenance_costs = calculator.get_monthly_repair_maintenance_cost(annual_maintenance_costs)
+    return {
+        'monthly_loan_payment': monthly_loan_payments,
+        'monthly_gas_cost': monthly_gas_costs,
+        'monthly_repair_maintenance_cost': monthly_repair_maintenance_costs,
+        'total_monthly_cost': monthly_loan_payments + monthly_gas_costs + monthly_repair_maintenance_costs,
+    }
+
+
+def simulate_total_costs(scenario, paths=1_000_000, uncertainty=None, percentiles=DEFAULT_PERCENTILES,
+                         chunk_size=250_000, workers=None, seed=None):
+    """
+    Run a Monte Carlo simulation of a vehicle's monthly costs and summarize them as percentiles.
+
+    Gas price, annual mileage, interest rate and maintenance cost are sampled around their
+    point estimates, then pushed through the same loan, gas and maintenance formulas as
+    VehicleCostCalculator.calculate_total_costs. Paths are split into chunks with their own
+    seeds, so results are reproducible for a given seed whatever the number of workers.
+
+    Args:
+        scenario (dict): Contains 'purchase_price', 'loan_interest_rate' (annual fraction),
+                         'loan_term_years', 'mileage' (annual), 'mpg', 'gas_price' (per gallon),
+                         'annual_maintenance_cost' and optionally 'down_payment_amount'.
+        paths (int, optional): The number of simulated paths. Defaults to 1,000,000.
+        uncertainty (dict, optional): Overrides for DEFAULT_UNCERTAINTY.
+        percentiles (tuple, optional): The percentiles to report. Defaults to 5, 25, 50, 75, 95.
+        chunk_size (int, optional): Paths simulated per chunk. Defaults to 250,000.
+        workers (int, optional): Number of worker processes for the chunks. Defaults to None,
+                                 which simulates every chunk in this process.
+        seed (int, optional): Seed for reproducible results. Defaults to None.
+
+    Returns:
+        dict: For every field in COST_FIELDS, a dictionary with the 'mean' and each requested
+              percentile of the simulated monthly cost.
+    """
+    uncertainty = {**DEFAULT_UNCERTAINTY, **(uncertainty or {})}
+    chunk_paths = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_paths))
+    arguments = ([scenario] * len(chunk_paths), [uncertainty] * len(chunk_paths), chunk_paths, seeds)
+
+    if workers:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(simulate_chunk, *arguments))
+    else:
+        chunks = list(map(simulate_chunk, *arguments))
+
+    summary = {}
+    for field in COST_FIELDS:
+        samples = np.concatenate([chunk[field] for chunk in chunks])
+        summary[field] = {'mean': float(samples.mean())}
+        for percentile, value in zip(percentiles, np.percentile(samples, percentiles)):
+            summary[field][percentile] = float(value)
+    return summary
+
+
+def simulate_vehicle(make, model, mileage, state, gas_grade, financial_info, gas_prices_url=GAS_PRICES_URL, **kwargs):
+    """
+    Fetch a vehicle's point estimates and run simulate_total_costs on them.
+
+    Args:
+        make (str): The make of the vehicle.
+        model (str): The model of the vehicle.
+        mileage (float): The miles driven annually, e.g. from get_driving_habits.
+        state (str): The state where the user is located.
+        gas_grade (str): The grade of gas to be used.
+        financial_info (tuple): Contains purchase price, loan interest rate, loan term, and down payment amount.
+        gas_prices_url (str, optional): The URL to scrape for gas prices.
+        **kwargs: Passed on to simulate_total_costs.
+
+    Returns:
+        dict: The summary returned by simulate_total_costs, or None if the vehicle's MPG,
+              maintenance cost or gas price could not be fetched.
+    """
+    purchase_price, loan_interest_rate, loan_term_years, down_payment_amount = financial_info
+    mpg = scraper.get_vehicle_mpg(make, model)
+    annual_maintenance_cost = maintenance_index.get_maintenance_costs(make, model, mileage)
+    snapshot = gas_price_store.get_snapshot(gas_prices_url)
+    gas_price = snapshot.get_price(state, gas_grade) if snapshot is not None else None
+    if mpg is None or annual_maintenance_cost is None or gas_price is None:
+        return None
+
+    scenario = {
+        'purchase_price': purchase_price,
+        'loan_interest_rate': loan_interest_rate,
+        'loan_term_years': loan_term_years,
+        'down_payment_amount': down_payment_amount,
+        'mileage': mileage,
+        'mpg': mpg,
+        'gas_price': gas_price,
+        'annual_maintenance_cost': annual_maintenance_cost,
+    }
+    return simulate_total_costs(scenario, **kwargs)
@@ -0,0 +1,187 @@
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional, SoupParser is used without it
+    lxml = None
+
+
+GAS_GRADE_CLASSES = {
+    'regular': 'Regular',
+    'mid_grade': 'MidGrade',
+    'premium': 'Premium',
+    'diesel': 'Diesel',
+}
+
+MAINTENANCE_TABLE_CLASS = 'table table-striped table-bordered table-hover'
+
+
+class SoupParser:
+    """
+    Extracts scraped tables with BeautifulSoup and Python's built-in html.parser.
+    """
+    def parse_gas_prices(self, html):
+        """
+        Extract gas prices per state from the AAA state averages page.
+
+        Args:
+            html (str): The page HTML.
+
+        Returns:
+            dict: States mapped to a dictionary of gas grade to price string (without the
+                  dollar sign), or None if the prices table is missing.
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        gas_table = soup.find('table', {'id': 'sortable'})
+        if not gas_table:
+            return None
+
+        gas_prices = {}
+        for row in gas_table.find('tbody').find_all('tr'):
+            state = row.find('td').text.strip()
+            gas_prices[state] = {
+                grade: row.find('td', {'class': css_class}).text.strip()[1:]
+                for css_class, grade in GAS_GRADE_CLASSES.items()
+            }
+        return gas_prices
+
+    def parse_vehicle_mpg(self, html):
+        """
+        Extract the MPG values listed in a caredge vehicle page.
+
+        Args:
+            html (str): The page HTML.
+
+        Returns:
+            list: The MPG text of the third column of every row, or None if the MPG table
+                  is missing.
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        mpg_table = soup.find('table', class_='mpg-table')
+        if not mpg_table:
+            return None
+
+        values = []
+        for row in mpg_table.find_all('tr'):
+            columns = row.find_all('td')
+            if len(columns) >= 3:
+                values.append(columns[2].get_text().strip())
+        return values
+
+    def parse_maintenance_costs(self, html):
+        """
+        Extract the yearly maintenance costs from a caredge maintenance page.
+
+        Args:
+            html (str): The page HTML.
+
+        Returns:
+            list: Tuples of (year, annual cost without the dollar sign) as strings, or None
+                  if the maintenance table is missing.
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        maintenance_table = soup.find('table', class_=MAINTENANCE_TABLE_CLASS)
+        if not maintenance_table:
+            return None
+
+        rows = []
+        for row in maintenance_table.find('tbody').find_all('tr'):
+            cols = row.find_all('td')
+            if len(cols) >= 3:
+                rows.append((cols[0].text.strip(), cols[2].text.strip()[1:]))
+        return rows
+
+
+class LxmlParser:
+    """
+    Extracts scraped tables with lxml, locating only the tables of interest by XPath.
+
+    Produces the same results as SoupParser, several times faster.
+    """
+    def parse_gas_prices(self, html):
+        """
+        Extract gas prices per state from the AAA state averages page.
+
+        Args:
+            html (str): The page HTML.
+
+        Returns:
+            dict: States mapped to a dictionary of gas grade to price string (without the
+                  dollar sign), or None if the prices table is missing.
+        """
+        tables = lxml.html.fromstring(html).xpath('//table[@id="sortable"]')
+        if not tables:
+            return None
+
+        gas_prices = {}
+        for row in tables[0].find('.//tbody').iter('tr'):
+            cells = list(row.iter('td'))
+            state_prices = {}
+            # Take the first cell carrying each grade's class, like BeautifulSoup's find()
+            for cell in cells:
+                for css_class in cell.get('class', '').split():
+                    grade = GAS_GRADE_CLASSES.get(css_class)
+                    if grade is not None and grade not in state_prices:
+                        state_prices[grade] = cell.text_content().strip()[1:]
+            gas_prices[cells[0].text_content().strip()] = {
+                grade: state_prices[grade] for grade in GAS_GRADE_CLASSES.values()
+            }
+        return gas_prices
+
+    def parse_vehicle_mpg(self, html):
+        """
+        Extract the MPG values listed in a caredge vehicle page.
+
+        Args:
+            html (str): The page HTML.
+
+        Returns:
+            list: The MPG text of the third column of every row, or None if the MPG table
+                  is missing.
+        """
+        tables = lxml.html.fromstring(html).xpath(
+            '//table[contains(concat(" ", normalize-space(@class), " "), " mpg-table ")]'
+        )
+        if not tables:
+            return None
+
+        values = []
+        for row in tables[0].iter('tr'):
+            columns = list(row.iter('td'))
+            if len(columns) >= 3:
+                values.append(columns[2].text_content().strip())
+        return values
+
+    def parse_maintenance_costs(self, html):
+        """
+        Extract the yearly maintenance costs from a caredge maintenance page.
+
+        Args:
+            html (str): The page HTML.
+
+        Returns:
+            list: Tuples of (year, annual cost without the dollar sign) as strings, or None
+                  if the maintenance table is missing.
+        """
+        tables = lxml.html.fromstring(html).xpath(f'//table[@class="{MAINTENANCE_TABLE_CLASS}"]')
+        if not tables:
+            return None
+
+        rows = []
+        for row in tables[0].find('.//tbody').iter('tr'):
+            cols = list(row.iter('td'))
+            if len(cols) >= 3:
+                rows.append((cols[0].text_content().strip(), cols[2].text_content().strip()[1:]))
+        return rows
+
+
+def get_default_parser():
+    """
+    Get the fastest parser available.
+
+    Returns:
+        LxmlParser if lxml is installed, otherwise SoupParser.
+    """
+    if lxml is not None:
+        return LxmlParser()
+    return SoupParser()
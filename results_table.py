@@ -0,0 +1,323 @@
+import json
+import math
+import os
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pyarrow is optional, only needed to write Parquet and Arrow files
+    pyarrow = None
+
+
+# Numeric scenario inputs and results, stored as float64 with NaN for missing values
+NUMBER_COLUMNS = [
+    'mileage', 'purchase_price', 'loan_interest_rate', 'loan_term_years', 'down_payment_amount',
+    'monthly_loan_payment', 'monthly_gas_cost', 'monthly_repair_maintenance_cost', 'total_monthly_cost',
+]
+# Repeated strings, stored as int32 indexes into an interned table with -1 for missing values
+INDEX_COLUMNS = ['vehicle', 'state', 'gas_grade', 'error']
+TABLES_FILE = 'tables.json'
+
+
+class CostResultTable:
+    """
+    Scenario pricing results held in typed arrays, one per column, instead of one dict per scenario.
+
+    Costs and numeric inputs are float64 arrays. Vehicles, states, gas grades and error
+    messages repeat across millions of scenarios, so each is interned once into a table
+    and stored per row as an int32 index into it. A million rows take about 88 MB.
+
+    Slicing with [start:stop] returns a table viewing the same arrays, without copying.
+    save() writes every column as a .npy file that load() memory-maps back, so readers can
+    slice a results file without parsing it; to_arrow() and write_parquet() hand the same
+    arrays to pyarrow when it is installed.
+    """
+    def __init__(self, columns=None, vehicles=None, states=None, gas_grades=None, errors=None, capacity=1024):
+        """
+        Initialize the CostResultTable class, empty or over existing column arrays.
+
+        Args:
+            columns (dict, optional): Column names mapped to equally long arrays, with every
+                                      name in NUMBER_COLUMNS and INDEX_COLUMNS. Defaults to empty columns.
+            vehicles (list, optional): The (make, model) pairs indexed by the 'vehicle' column.
+            states (list, optional): The states indexed by the 'state' column.
+            gas_grades (list, optional): The gas grades indexed by the 'gas_grade' column.
+            errors (list, optional): The error messages indexed by the 'error' column.
+            capacity (int, optional): Rows allocated up front for an empty table. Defaults to 1024.
+        """
+        self.tables = {
+            'vehicle': [tuple(vehicle) for vehicle in vehicles or []],
+            'state': list(states or []),
+            'gas_grade': list(gas_grades or []),
+            'error': list(errors or []),
+        }
+        self._indexes = {name: {value: index for index, value in enumerate(values)}
+                         for name, values in self.tables.items()}
+        if columns is None:
+            columns = {name: np.empty(capacity, dtype=np.float64) for name in NUMBER_COLUMNS}
+            columns.update({name: np.empty(capacity, dtype=np.int32) for name in INDEX_COLUMNS})
+            self._length = 0
+        else:
+            self._length = len(columns['total_monthly_cost'])
+        self._columns = columns
+
+    @classmethod
+    def from_results(cls, results):
+        """
+        Build a table from result dictionaries, consuming them one at a time.
+
+        Args:
+            results (iterable): Result dictionaries, as produced by batch_pricing.price_chunk.
+
+        Returns:
+            CostResultTable: The table.
+        """
+        table = cls()
+        table.extend(results)
+        return table
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        """
+        Get one row as a result dictionary, or a table of several rows.
+
+        Args:
+            key (int, slice or array): A row number, a slice, or an array of row numbers or booleans.
+
+        Returns:
+            dict or CostResultTable: The row, or a table that shares this table's interned
+                                     values. Slices share its arrays as well.
+        """
+        if isinstance(key, (int, np.integer)):
+            return self.get_row(key)
+        columns = {name: array[key] for name, array in self.columns.items()}
+        return CostResultTable(columns, self.tables['vehicle'], self.tables['state'],
+                               self.tables['gas_grade'], self.tables['error'])
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self.get_row(index)
+
+    @property
+    def columns(self):
+        """
+        dict: Column names mapped to arrays of exactly len(self) rows, viewing the table's storage.
+        """
+        return {name: array[:self._length] for name, array in self._columns.items()}
+
+    def intern(self, name, value):
+        """
+        Get the index of a value in an interned table, adding it if it is new.
+
+        Args:
+            name (str): The index column, one of INDEX_COLUMNS.
+            value: The value, or None.
+
+        Returns:
+            int: The index of the value, or -1 for None.
+        """
+        if value is None:
+            return -1
+        indexes = self._indexes[name]
+        index = indexes.get(value)
+        if index is None:
+            index = indexes[value] = len(self.tables[name])
+            self.tables[name].append(value)
+        return index
+
+    def append(self, result):
+        """
+        Add one result as a row.
+
+        Args:
+            result (dict): A result dictionary, as produced by batch_pricing.price_chunk.
+                           Missing or unparseable numbers are stored as NaN.
+        """
+        if self._length == len(self._columns['total_monthly_cost']):
+            self._grow()
+        row = self._length
+        for name in NUMBER_COLUMNS:
+            self._columns[name][row] = to_float(result.get(name))
+        make, model = result.get('make'), result.get('model')
+        vehicle = (make, model) if make is not None and model is not None else None
+        self._columns['vehicle'][row] = self.intern('vehicle', vehicle)
+        self._columns['state'][row] = self.intern('state', result.get('state'))
+        self._columns['gas_grade'][row] = self.intern('gas_grade', result.get('gas_grade'))
+        self._columns['error'][row] = self.intern('error', result.get('error'))
+        self._length += 1
+
+    def extend(self, results):
+        """
+        Add results as rows.
+
+        Args:
+            results (iterable): Result dictionaries, as produced by batch_pricing.price_chunk.
+        """
+        for result in results:
+            self.append(result)
+
+    def _grow(self):
+        # Double the storage. This also copies memory-mapped columns into writable memory.
+        capacity = max(2 * len(self._columns['total_monthly_cost']), 1024)
+        for name, array in self._columns.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self._length] = array[:self._length]
+            self._columns[name] = grown
+
+    def get_row(self, index):
+        """
+        Get one row as a result dictionary.
+
+        Args:
+            index (int): The row number. Negative numbers count from the end.
+
+        Returns:
+            dict: The scenario fields and results, as produced by batch_pricing.price_chunk,
+                  with None for missing values. 'error' is only present for failed scenarios.
+        """
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"Row {index} is out of range for {self._length} rows")
+        vehicle = self.get_value('vehicle', index)
+        row = {'make': vehicle[0] if vehicle else None, 'model': vehicle[1] if vehicle else None}
+        for name in NUMBER_COLUMNS:
+            value = float(self._columns[name][index])
+            row[name] = None if math.isnan(value) else value
+        row['state'] = self.get_value('state', index)
+        row['gas_grade'] = self.get_value('gas_grade', index)
+        error = self.get_value('error', index)
+        if error is not None:
+            row['error'] = error
+        return row
+
+    def get_value(self, name, index):
+        """
+        Get the interned value of an index column at one row.
+
+        Args:
+            name (str): The index column, one of INDEX_COLUMNS.
+            index (int): The row number.
+
+        Returns:
+            The value, or None if it is missing.
+        """
+        value_index = self._columns[name][index]
+        return self.tables[name][value_index] if value_index >= 0 else None
+
+    def save(self, directory):
+        """
+        Write the table as one .npy file per column plus a JSON file of the interned values.
+
+        Args:
+            directory (str): The directory to write, created if it does not exist.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self.columns.items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        with open(os.path.join(directory, TABLES_FILE), 'w') as file:
+            json.dump({'version': 1, 'rows': self._length, 'tables': self.tables}, file)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Memory-map a table previously written by save().
+
+        Nothing is read until it is used, so slicing a large file only loads the rows sliced.
+
+        Args:
+            directory (str): The directory written by save().
+
+        Returns:
+            CostResultTable: The memory-mapped table. Appending to it copies it into memory.
+        """
+        with open(os.path.join(directory, TABLES_FILE), 'r') as file:
+            tables = json.load(file)['tables']
+        columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+                   for name in NUMBER_COLUMNS + INDEX_COLUMNS}
+        return cls(columns, tables['vehicle'], tables['state'], tables['gas_grade'], tables['error'])
+
+    def to_arrow(self):
+        """
+        Convert the table to an Arrow table without copying the numeric columns.
+
+        NaN becomes null. Index columns become dictionary-encoded columns over the interned
+        values, and the vehicle index is split into 'make' and 'model' columns sharing the
+        same indices.
+
+        Returns:
+            pyarrow.Table: The table.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        if pyarrow is None:
+            raise ImportError("pyarrow is required to convert results to Arrow or Parquet")
+        columns = self.columns
+        vehicles = self.tables['vehicle']
+        arrays = {
+            'make': get_dictionary_array(columns['vehicle'], [make for make, _ in vehicles]),
+            'model': get_dictionary_array(columns['vehicle'], [model for _, model in vehicles]),
+        }
+        for name in NUMBER_COLUMNS:
+            arrays[name] = pyarrow.array(columns[name], from_pandas=True)
+        for name in ['state', 'gas_grade', 'error']:
+            arrays[name] = get_dictionary_array(columns[name], self.tables[name])
+        return pyarrow.table(arrays)
+
+    def write_parquet(self, file_path):
+        """
+        Write the table to a Parquet file.
+
+        Args:
+            file_path (str): The path of the file to write.
+        """
+        pyarrow.parquet.write_table(self.to_arrow(), file_path)
+
+    def write_arrow(self, file_path):
+        """
+        Write the table to an Arrow IPC file, which readers can memory-map with pyarrow.memory_map.
+
+        Args:
+            file_path (str): The path of the file to write.
+        """
+        table = self.to_arrow()
+        with pyarrow.OSFile(file_path, 'wb') as sink, pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def get_dictionary_array(indices, values):
+    """
+    Build a dictionary-encoded Arrow array from an index column, with -1 as null.
+
+    Args:
+        indices (numpy.ndarray): The int32 indices.
+        values (list): The interned strings they index.
+
+    Returns:
+        pyarrow.DictionaryArray: The array.
+    """
+    missing = indices < 0
+    indices = pyarrow.array(indices, mask=missing) if missing.any() else pyarrow.array(indices)
+    return pyarrow.DictionaryArray.from_arrays(indices, pyarrow.array(values, type=pyarrow.string()))
+
+
+def to_float(value):
+    """
+    Convert a result value to a float for a number column.
+
+    Args:
+        value: The value, possibly None or a string.
+
+    Returns:
+        float: The value, or NaN if it is missing or not a number.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
@@ -1,42 +1,254 @@
 import requests
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from http_archive import NotRecordedError
+from parsers import get_default_parser
+from instrumentation import metrics
 import math
+import random
+import threading
 import time
 
 
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Connection': 'keep-alive',
+}
+
+
+def print_progress(done, total):
+    """
+    Print prefetch progress on a single, continuously updated line.
+
+    Args:
+        done (int): The number of finished fetches.
+        total (int): The total number of fetches.
+    """
+    print(f"\rPrefetched {done}/{total}", end='\n' if done == total else '', flush=True)
+
+
 class Scraper:
-    def fetch_and_parse_url(self, url, headers=None, retries=3, timeout=10):
+    def __init__(self, cache=None, max_requests_per_host=4, pool_size=10, backoff_factor=1.0, max_backoff=30,
+                 parser=None, archive=None):
         """
-        Fetches the content of the URL and parses it with BeautifulSoup, with retry logic.
+        Initialize the Scraper class. Its pooled, keep-alive HTTP session is created on the first request.
+
+        Args:
+            cache (ScraperCache, optional): Cache for scraped results. Defaults to None, which
+                                            fetches every request from the web.
+            max_requests_per_host (int, optional): Maximum concurrent requests to a single host.
+                                                   Defaults to 4.
+            pool_size (int, optional): Number of connections kept open per host. Defaults to 10.
+            backoff_factor (float, optional): Base delay in seconds between retries, doubled on
+                                              every attempt. Defaults to 1.0.
+            max_backoff (float, optional): Upper bound for the retry delay in seconds. Defaults to 30.
+            parser (optional): Backend extracting data from the fetched HTML, such as
+                               parsers.SoupParser or parsers.LxmlParser. Defaults to the
+                               fastest one installed.
+            archive (ResponseArchive, optional): Archive to record responses into or replay them
+                                                 from, instead of only using the network.
+                                                 Defaults to None.
+        """
+        self.cache = cache
+        self.parser = parser if parser is not None else get_default_parser()
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.max_requests_per_host = max_requests_per_host
+        self._host_limits = {}
+        self._host_limits_lock = threading.Lock()
+        self.archive = None
+        if archive is not None:
+            self.use_archive(archive)
+
+    def use_archive(self, archive):
+        """
+        Send every later request through a response archive, to record or replay it.
+
+        Args:
+            archive (ResponseArchive): The archive to use.
+        """
+        self.archive = archive
+        if self._session is not None:
+            self._mount(self._session, archive.get_adapter(self.pool_size))
+
+    @property
+    def session(self):
+        """
+        requests.Session: The pooled, keep-alive HTTP session, created on the first request.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    session.headers.update(DEFAULT_HEADERS)
+                    if self.archive is not None:
+                        adapter = self.archive.get_adapter(self.pool_size)
+                    else:
+                        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    self._mount(session, adapter)
+                    self._session = session
+        return self._session
+
+    def _mount(self, session, adapter):
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    def get_host_limit(self, url):
+        """
+        Get the semaphore limiting concurrent requests to the host of a URL.
+
+        Args:
+            url (str): The URL about to be fetched.
+
+        Returns:
+            threading.BoundedSemaphore: The semaphore shared by all requests to that host.
+        """
+        host = urlparse(url).netloc
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_requests_per_host)
+            return self._host_limits[host]
+
+    def get_retry_delay(self, attempt):
+        """
+        Get how long to wait before the next retry, using exponential backoff with full jitter.
+
+        Args:
+            attempt (int): The zero-based number of the attempt that just failed.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    def close(self):
+        """
+        Close the HTTP session and its pooled connections.
+        """
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_cached(self, source, url):
+        """
+        Get a previously scraped result from the cache.
+
+        Args:
+            source (str): The data source of the result (e.g. 'gas_prices').
+            url (str): The URL the result was scraped from.
+
+        Returns:
+            The cached result, or None if there is no cache or no fresh entry.
+        """
+        entry = self.get_cached_entry(source, url)
+        return None if entry is None else entry[0]
+
+    def get_cached_entry(self, source, url, max_age=None):
+        """
+        Get a previously scraped result from the cache, with the time it was scraped.
+
+        Args:
+            source (str): The data source of the result (e.g. 'gas_prices').
+            url (str): The URL the result was scraped from.
+            max_age (float, optional): Ignore entries older than this many seconds. Defaults to
+                                       None, using only the source's TTL.
+
+        Returns:
+            tuple: Contains the cached result and the time it was stored, or None if there is
+                   no cache or no fresh entry.
+        """
+        if self.cache is None:
+            return None
+        entry = self.cache.get_entry(source, url, max_age)
+        if entry is None:
+            metrics.increment('scraper_cache_misses_total', labels={'source': source})
+        else:
+            metrics.increment('scraper_cache_hits_total', labels={'source': source})
+        return entry
+
+    def store_cached(self, source, url, value):
+        """
+        Store a scraped result in the cache, if one is configured.
+
+        Args:
+            source (str): The data source of the result.
+            url (str): The URL the result was scraped from.
+            value: The scraped result.
+        """
+        if self.cache is not None:
+            self.cache.set(source, url, value)
+
+    def fetch_url(self, url, headers=None, retries=3, timeout=10):
+        """
+        Fetches the content of the URL, with retry logic.
 
         Args:
             url (str): The URL to fetch and parse.
-            headers (dict, optional): HTTP headers to include in the request. Defaults to None.
+            headers (dict, optional): Extra HTTP headers to include in the request, on top of the
+                                      session's DEFAULT_HEADERS. Defaults to None.
             retries (int, optional): Number of retries in case of failure. Defaults to 3.
             timeout (int, optional): Timeout for the request in seconds. Defaults to 10.
 
         Returns:
-            BeautifulSoup: Parsed HTML content of the URL, or None if failed.
+            str: The HTML content of the URL, or None if failed.
         """
-        if headers is None:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-
         for attempt in range(retries):
             try:
-                response = requests.get(url, headers=headers, timeout=timeout)
+                with metrics.timer('scraper_fetch_seconds'):
+                    with self.get_host_limit(url):
+                        metrics.increment('scraper_requests_total')
+                        response = self.session.get(url, headers=headers, timeout=timeout)
+                # Time until the response headers were parsed, which covers DNS, connecting and the server
+                metrics.observe('scraper_http_response_seconds', response.elapsed.total_seconds())
+                metrics.increment('scraper_bytes_fetched_total', len(response.content))
                 response.raise_for_status()
-                return BeautifulSoup(response.text, 'html.parser')
+                return response.text
+            except NotRecordedError as e:
+                # A replayed archive gives the same answer every time, so retrying cannot help
+                metrics.increment('scraper_fetch_errors_total')
+                print(f"Error fetching URL {url}: {e}")
+                return None
             except requests.RequestException as e:
+                metrics.increment('scraper_fetch_errors_total')
                 print(f"Error fetching URL {url} on attempt {attempt + 1}/{retries}: {e}")
                 if attempt < retries - 1:
-                    time.sleep(2)  # Wait for 2 seconds before retrying
+                    metrics.increment('scraper_retries_total')
+                    time.sleep(self.get_retry_delay(attempt))
         return None
 
-    def get_maintenance_costs(self, make, model, mileage):
+    def fetch_and_parse_url(self, url, headers=None, retries=3, timeout=10):
         """
-        Scrape the maintenance costs for a specific make and model from the given URL.
+        Fetches the content of the URL and parses it with BeautifulSoup, with retry logic.
+
+        Args:
+            url (str): The URL to fetch and parse.
+            headers (dict, optional): Extra HTTP headers to include in the request. Defaults to None.
+            retries (int, optional): Number of retries in case of failure. Defaults to 3.
+            timeout (int, optional): Timeout for the request in seconds. Defaults to 10.
+
+        Returns:
+            BeautifulSoup: Parsed HTML content of the URL, or None if failed.
+        """
+        html = self.fetch_url(url, headers, retries, timeout)
+        if html is None:
+            return None
+        with metrics.timer('scraper_soup_parse_seconds'):
+            return BeautifulSoup(html, 'html.parser')
+
+    def get_maintenance_costs_url(self, make, model, mileage):
+        """
+        Build the caredge URL listing the maintenance costs of a vehicle.
 
         Args:
             make (str): The make of the vehicle.
@@ -44,108 +256,155 @@ class Scraper:
             mileage (str): The mileage of the vehicle.
 
         Returns:
-            float: The maintenance cost for the first year, or None if failed.
+            str: The maintenance costs URL.
         """
-        url = f"https://caredge.com/{make.lower()}/{model.lower()}/maintenance?m={mileage}"
-        print(f"Fetching maintenance costs from URL: {url}")
-        soup = self.fetch_and_parse_url(url)
-
-        if soup:
-            maintenance_costs_section = soup.find('table', class_='table table-striped table-bordered table-hover')
-            if maintenance_costs_section:
-                rows = maintenance_costs_section.find('tbody').find_all('tr')
-                first_year_cost = None
-                for row in rows:
-                    cols = row.find_all('td')
-                    if cols[0].text.strip() == '1':  # Check if the year is '1'
-                        first_year_cost = cols[2].text.strip()[1:]  # Get the annual cost without the dollar sign
-                        break
-
-                if first_year_cost:
-                    return float(first_year_cost)
+        return f"https://caredge.com/{make.lower()}/{model.lower()}/maintenance?m={mileage}"
+
+    def get_vehicle_mpg_url(self, make, model):
+        """
+        Build the caredge URL listing the MPG of a vehicle.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+
+        Returns:
+            str: The vehicle URL.
+        """
+        return f"https://caredge.com/{make.lower()}/{model.lower()}#interest"
+
+    def extract_maintenance_cost_curve(self, url, html, make, model):
+        """
+        Extract the maintenance cost of every year of ownership from a fetched page and cache it.
+
+        Args:
+            url (str): The URL the page was fetched from.
+            html (str): The page HTML, or None if fetching failed.
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+
+        Returns:
+            list: The annual maintenance cost of years 1, 2, ... as floats, with None for any
+                  year missing from the table, or None if failed.
+        """
+        if html:
+            with metrics.timer('scraper_parse_seconds', {'source': 'maintenance'}):
+                rows = self.parser.parse_maintenance_costs(html)
+            if rows is not None:
+                costs = {}
+                for year, annual_cost in rows:
+                    try:
+                        year = int(year)
+                        annual_cost = float(annual_cost.replace(',', ''))
+                    except ValueError:
+                        continue
+                    if year >= 1:
+                        costs[year] = annual_cost
+
+                if costs:
+                    curve = [costs.get(year) for year in range(1, max(costs) + 1)]
+                    self.store_cached('maintenance_curve', url, curve)
+                    return curve
                 else:
-                    print(f"First year maintenance cost for {make} {model} not found.")
+                    print(f"Maintenance costs for {make} {model} not found.")
             else:
                 print("Maintenance costs section not found.")
         else:
             print("Failed to retrieve the webpage.")
         return None
 
-    def get_gas_prices(self, url):
+    def get_first_year_cost(self, url, curve, make, model):
         """
-        Scrape gas prices for different states from the given URL.
+        Get the first-year maintenance cost from a cost curve and cache it.
 
         Args:
-            url (str): The URL to scrape for gas prices.
+            url (str): The URL the curve was scraped from.
+            curve (list): The annual maintenance costs, as returned by extract_maintenance_cost_curve.
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
 
         Returns:
-            dict: A dictionary containing gas prices for different states, or None if failed.
+            float: The maintenance cost for the first year, or None if it is missing.
         """
-        print(f"Fetching gas prices from URL: {url}")
-        soup = self.fetch_and_parse_url(url)
-
-        if soup:
-            gas_table = soup.find('table', {'id': 'sortable'})
-            if gas_table:
-                rows = gas_table.find('tbody').find_all('tr')
-                gas_prices = {}
-
-                for row in rows:
-                    state = row.find('td').text.strip()
-                    regular_price = row.find('td', {'class': 'regular'}).text.strip()[1:]
-                    mid_grade_price = row.find('td', {'class': 'mid_grade'}).text.strip()[1:]
-                    premium_price = row.find('td', {'class': 'premium'}).text.strip()[1:]
-                    diesel_price = row.find('td', {'class': 'diesel'}).text.strip()[1:]
-
-                    state_prices = {
-                        'Regular': regular_price,
-                        'MidGrade': mid_grade_price,
-                        'Premium': premium_price,
-                        'Diesel': diesel_price
-                    }
-
-                    gas_prices[state] = state_prices
+        first_year_cost = curve[0]
+        if first_year_cost is None:
+            print(f"First year maintenance cost for {make} {model} not found.")
+            return None
+        self.store_cached('maintenance', url, first_year_cost)
+        return first_year_cost
 
-                return gas_prices
+    def extract_maintenance_costs(self, url, html, make, model):
+        """
+        Extract the first-year maintenance cost from a fetched page and cache it, along with
+        the costs of the later years.
+
+        Args:
+            url (str): The URL the page was fetched from.
+            html (str): The page HTML, or None if fetching failed.
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
 
+        Returns:
+            float: The maintenance cost for the first year, or None if failed.
+        """
+        curve = self.extract_maintenance_cost_curve(url, html, make, model)
+        if curve is None:
+            return None
+        return self.get_first_year_cost(url, curve, make, model)
+
+    def extract_gas_prices(self, url, html):
+        """
+        Extract the gas prices per state from a fetched page and cache them.
+
+        Args:
+            url (str): The URL the page was fetched from.
+            html (str): The page HTML, or None if fetching failed.
+
+        Returns:
+            dict: A dictionary containing gas prices for different states, or None if failed.
+        """
+        if html:
+            with metrics.timer('scraper_parse_seconds', {'source': 'gas_prices'}):
+                gas_prices = self.parser.parse_gas_prices(html)
+            if gas_prices is not None:
+                self.store_cached('gas_prices', url, gas_prices)
+                return gas_prices
             else:
                 print("Gas prices table not found.")
         else:
             print("Failed to retrieve the webpage.")
         return None
 
-    def get_vehicle_mpg(self, make, model):
+    def extract_vehicle_mpg(self, url, html, make, model):
         """
-        Scrape the average MPG for a specific vehicle make and model.
+        Extract the average MPG from a fetched page and cache it.
 
         Args:
+            url (str): The URL the page was fetched from.
+            html (str): The page HTML, or None if fetching failed.
             make (str): The make of the vehicle.
             model (str): The model of the vehicle.
 
         Returns:
             int: The average MPG for the vehicle, or None if failed.
         """
-        url = f"https://caredge.com/{make.lower()}/{model.lower()}#interest"
-        print(f"Fetching MPG from URL: {url}")
-        soup = self.fetch_and_parse_url(url)
-
-        if soup:
-            mpg_table = soup.find('table', class_='mpg-table')
-            if mpg_table:
-                rows = mpg_table.find_all('tr')
+        if html:
+            with metrics.timer('scraper_parse_seconds', {'source': 'mpg'}):
+                mpg_values = self.parser.parse_vehicle_mpg(html)
+            if mpg_values is not None:
                 total_mpg = 0
                 count = 0
-                for row in rows:
-                    columns = row.find_all('td')
-                    if len(columns) >= 3:
-                        try:
-                            mpg_value = int(columns[2].get_text().strip())
-                            total_mpg += mpg_value
-                            count += 1
-                        except ValueError:
-                            continue
+                for value in mpg_values:
+                    try:
+                        mpg_value = int(value)
+                        total_mpg += mpg_value
+                        count += 1
+                    except ValueError:
+                        continue
                 if count > 0:
-                    return math.ceil(total_mpg / count)  # Round up the average MPG and return as an integer
+                    average_mpg = math.ceil(total_mpg / count)  # Round up the average MPG and return as an integer
+                    self.store_cached('mpg', url, average_mpg)
+                    return average_mpg
                 else:
                     print(f"No valid MPG values found for {make} {model}.")
             else:
@@ -153,3 +412,150 @@ class Scraper:
         else:
             print("Failed to retrieve the webpage.")
         return None
+
+    @metrics.timed('scraper_get_seconds', {'source': 'maintenance'})
+    def get_maintenance_costs(self, make, model, mileage):
+        """
+        Scrape the maintenance costs for a specific make and model from the given URL.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            mileage (str): The mileage of the vehicle.
+
+        Returns:
+            float: The maintenance cost for the first year, or None if failed.
+        """
+        url = self.get_maintenance_costs_url(make, model, mileage)
+        cached = self.get_cached('maintenance', url)
+        if cached is not None:
+            return cached
+        curve = self.get_cached('maintenance_curve', url)
+        if curve is not None:
+            return self.get_first_year_cost(url, curve, make, model)
+        print(f"Fetching maintenance costs from URL: {url}")
+        return self.extract_maintenance_costs(url, self.fetch_url(url), make, model)
+
+    @metrics.timed('scraper_get_seconds', {'source': 'maintenance_curve'})
+    def get_maintenance_cost_curve(self, make, model, mileage):
+        """
+        Scrape the maintenance cost of every year of ownership for a specific make and model.
+
+        The whole curve comes from the same page as get_maintenance_costs, so one fetch
+        serves both.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+            mileage (str): The mileage of the vehicle.
+
+        Returns:
+            list: The annual maintenance cost of years 1, 2, ... as floats, with None for any
+                  missing year, or None if failed.
+        """
+        url = self.get_maintenance_costs_url(make, model, mileage)
+        cached = self.get_cached('maintenance_curve', url)
+        if cached is not None:
+            return cached
+        print(f"Fetching maintenance costs from URL: {url}")
+        return self.extract_maintenance_cost_curve(url, self.fetch_url(url), make, model)
+
+    @metrics.timed('scraper_get_seconds', {'source': 'gas_prices'})
+    def get_gas_prices(self, url):
+        """
+        Scrape gas prices for different states from the given URL.
+
+        Args:
+            url (str): The URL to scrape for gas prices.
+
+        Returns:
+            dict: A dictionary containing gas prices for different states, or None if failed.
+        """
+        return self.get_gas_prices_with_time(url)[0]
+
+    def get_gas_prices_with_time(self, url, max_age=None):
+        """
+        Scrape gas prices like get_gas_prices, also returning when they were scraped.
+
+        Args:
+            url (str): The URL to scrape for gas prices.
+            max_age (float, optional): Scrape again rather than use cached prices older than
+                                       this many seconds. Defaults to None, using the cache's TTL.
+
+        Returns:
+            tuple: Contains the gas prices (or None if failed) and the time they were scraped,
+                   which is when they were cached if they came from the cache.
+        """
+        entry = self.get_cached_entry('gas_prices', url, max_age)
+        if entry is not None:
+            return entry
+        print(f"Fetching gas prices from URL: {url}")
+        fetched_at = time.time()
+        return self.extract_gas_prices(url, self.fetch_url(url)), fetched_at
+
+    @metrics.timed('scraper_get_seconds', {'source': 'mpg'})
+    def get_vehicle_mpg(self, make, model):
+        """
+        Scrape the average MPG for a specific vehicle make and model.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+
+        Returns:
+            int: The average MPG for the vehicle, or None if failed.
+        """
+        url = self.get_vehicle_mpg_url(make, model)
+        cached = self.get_cached('mpg', url)
+        if cached is not None:
+            return cached
+        print(f"Fetching MPG from URL: {url}")
+        return self.extract_vehicle_mpg(url, self.fetch_url(url), make, model)
+
+    def prefetch_catalog(self, catalog, makes=None, mileages=None, max_workers=16, progress=print_progress):
+        """
+        Concurrently fetch MPG and maintenance costs for every vehicle in a catalog.
+
+        Results are stored in the cache as they arrive, so later lookups for the same
+        vehicles are served without going back to the web. Each maintenance page stores both
+        the first-year cost and the full cost curve, so prefetching the catalog's mileages
+        also fills every bucket a MaintenanceIndex reads.
+
+        Args:
+            catalog (dict): Makes mapped to lists of models, as in vehicle_details.json.
+            makes (list, optional): Only prefetch these makes. Defaults to every make.
+            mileages (list, optional): Mileages to fetch maintenance costs for. Defaults to
+                                       the catalog's "Mileage" list.
+            max_workers (int, optional): Size of the thread pool. Defaults to 16.
+            progress (callable, optional): Called with (done, total) after each fetch.
+                                           Defaults to print_progress.
+
+        Returns:
+            dict: Contains 'mpg' keyed by (make, model) and 'maintenance' keyed by
+                  (make, model, mileage), with None for vehicles that failed.
+        """
+        if mileages is None:
+            mileages = catalog.get("Mileage", [])
+        vehicles = [
+            (make, model)
+            for make, models in catalog.items()
+            if make != "Mileage" and (makes is None or make in makes)
+            for model in models
+        ]
+
+        results = {'mpg': {}, 'maintenance': {}}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for make, model in vehicles:
+                futures[executor.submit(self.get_vehicle_mpg, make, model)] = ('mpg', (make, model))
+                for mileage in mileages:
+                    future = executor.submit(self.get_maintenance_costs, make, model, mileage)
+                    futures[future] = ('maintenance', (make, model, mileage))
+
+            total = len(futures)
+            for done, future in enumerate(as_completed(futures), start=1):
+                source, key = futures[future]
+                results[source][key] = future.result()
+                if progress is not None:
+                    progress(done, total)
+        return results
@@ -0,0 +1,158 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+# Default time-to-live in seconds for each kind of scraped data
+DEFAULT_TTLS = {
+    'gas_prices': 24 * 60 * 60,         # Gas prices change daily
+    'mpg': 90 * 24 * 60 * 60,           # MPG figures almost never change
+    'maintenance': 30 * 24 * 60 * 60,
+    'maintenance_curve': 30 * 24 * 60 * 60,
+}
+
+
+class ScraperCache:
+    """
+    A persistent cache for scraped results, stored in SQLite so it survives restarts.
+
+    Every entry belongs to a data source with its own time-to-live, and the cache
+    evicts the least recently used entries once it grows past max_entries.
+    """
+    def __init__(self, path='scraper_cache.sqlite', ttls=None, max_entries=10000):
+        """
+        Initialize the ScraperCache class. The database is opened, and the backing table
+        created, on first use.
+
+        Args:
+            path (str, optional): The SQLite database file. Defaults to 'scraper_cache.sqlite'.
+            ttls (dict, optional): Time-to-live in seconds per source, merged over DEFAULT_TTLS.
+            max_entries (int, optional): Maximum number of entries kept. Defaults to 10000.
+        """
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        # Called with the lock held
+        if self._connection is not None:
+            return self._connection
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        with connection:
+            # Entries are keyed by source and key, as different sources are scraped from the
+            # same URL. Caches from before that keyed by URL alone, so they are dropped.
+            primary_key = [row[1] for row in connection.execute("PRAGMA table_info(cache)") if row[5]]
+            if primary_key == ['key']:
+                connection.execute("DROP TABLE cache")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "source TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (source, key))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        self._connection = connection
+        return connection
+
+    def get(self, source, key):
+        """
+        Look up a cached value, counting the hit or miss.
+
+        Args:
+            source (str): The data source the entry belongs to (e.g. 'gas_prices').
+            key (str): The cache key, usually the scraped URL.
+
+        Returns:
+            The cached value, or None if it is missing or older than the source's TTL.
+        """
+        entry = self.get_entry(source, key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, source, key, max_age=None):
+        """
+        Look up a cached value and when it was stored, counting the hit or miss.
+
+        Args:
+            source (str): The data source the entry belongs to (e.g. 'gas_prices').
+            key (str): The cache key, usually the scraped URL.
+            max_age (float, optional): Treat entries older than this many seconds as missing,
+                                       if that is stricter than the source's TTL. Defaults to None.
+
+        Returns:
+            tuple: Contains the cached value and the time it was stored, or None if it is
+                   missing or too old.
+        """
+        now = time.time()
+        ttl = self.ttls.get(source, 0)
+        if max_age is not None:
+            ttl = min(ttl, max_age)
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value, stored_at FROM cache WHERE key = ? AND source = ?", (key, source)
+            ).fetchone()
+            if row is None or now - row[1] > ttl:
+                self.misses += 1
+                return None
+            with connection:
+                connection.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE source = ? AND key = ?", (now, source, key)
+                )
+            self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def set(self, source, key, value):
+        """
+        Store a value and evict the least recently used entries if the cache is full.
+
+        Args:
+            source (str): The data source the entry belongs to.
+            key (str): The cache key, usually the scraped URL.
+            value: A JSON-serializable value to store.
+        """
+        now = time.time()
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, source, value, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, source, json.dumps(value), now, now)
+            )
+            connection.execute(
+                "DELETE FROM cache WHERE rowid IN ("
+                "SELECT rowid FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        """
+        Remove every entry from the cache and reset the hit/miss counters.
+        """
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM cache")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Contains the number of hits, misses and entries currently stored.
+        """
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
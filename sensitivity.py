@@ -0,0 +1,57 @@
+import numpy as np
+
+from calculator import VehicleCostCalculator
+
+
+def calculate_loan_grid(annual_rates, years, down_payments, purchase_prices, monthly_gas_cost=0,
+                        monthly_repair_maintenance_cost=0, max_block_cells=1_000_000, out=None):
+    """
+    Calculate monthly loan payments and total monthly costs over a rate x term x down payment x price grid.
+
+    The payment factors depend only on rate and term, so they are computed once per pair
+    and broadcast against every principal. The grid is filled one block of rates at a time,
+    which keeps temporary arrays to about max_block_cells values however large the grid is.
+    Every cell matches calculate_monthly_loan_payment and calculate_total_costs exactly.
+
+    Args:
+        annual_rates (array_like): 1-D axis of annual interest rates.
+        years (array_like): 1-D axis of loan terms in years.
+        down_payments (array_like): 1-D axis of down payment amounts.
+        purchase_prices (array_like): 1-D axis of vehicle purchase prices.
+        monthly_gas_cost (float, optional): The vehicle's monthly gas cost. Defaults to 0.
+        monthly_repair_maintenance_cost (float, optional): The vehicle's monthly maintenance cost. Defaults to 0.
+        max_block_cells (int, optional): Grid cells computed per block. Defaults to 1,000,000.
+        out (dict, optional): Preallocated arrays (e.g. numpy.memmap) for 'monthly_loan_payment'
+                              and 'total_monthly_cost', shaped like the grid.
+
+    Returns:
+        dict: Float64 arrays 'monthly_loan_payment' and 'total_monthly_cost', indexed as
+              [rate, term, down payment, price].
+    """
+    annual_rates = np.asarray(annual_rates, dtype=np.float64)
+    years = np.asarray(years, dtype=np.float64)
+    down_payments = np.asarray(down_payments, dtype=np.float64)
+    purchase_prices = np.asarray(purchase_prices, dtype=np.float64)
+    shape = (annual_rates.size, years.size, down_payments.size, purchase_prices.size)
+    if out is None:
+        out = {
+            'monthly_loan_payment': np.empty(shape, dtype=np.float64),
+            'total_monthly_cost': np.empty(shape, dtype=np.float64),
+        }
+
+    numerators, denominators = VehicleCostCalculator().calculate_payment_factors(
+        annual_rates[:, np.newaxis], years[np.newaxis, :]
+    )
+    principals = purchase_prices[np.newaxis, :] - down_payments[:, np.newaxis]
+
+    cells_per_rate = max(1, shape[1] * shape[2] * shape[3])
+    block_rates = max(1, max_block_cells // cells_per_rate)
+    for start in range(0, shape[0], block_rates):
+        block = slice(start, start + block_rates)
+        payments = out['monthly_loan_payment'][block]
+        np.multiply(principals, numerators[block, :, np.newaxis, np.newaxis], out=payments)
+        np.divide(payments, denominators[block, :, np.newaxis, np.newaxis], out=payments)
+        totals = out['total_monthly_cost'][block]
+        np.add(payments, monthly_gas_cost, out=totals)
+        np.add(totals, monthly_repair_maintenance_cost, out=totals)
+    return out
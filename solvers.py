@@ -0,0 +1,189 @@
+import numpy as np
+
+from calculator import VehicleCostCalculator
+
+
+calculator = VehicleCostCalculator()
+
+
+def get_loan_budget(monthly_budget, monthly_gas_cost=0, monthly_repair_maintenance_cost=0):
+    """
+    Get how much of a total monthly budget is left for the loan payment.
+
+    Args:
+        monthly_budget (array_like): The total monthly amount the customer can spend.
+        monthly_gas_cost (array_like, optional): The monthly gas cost. Defaults to 0.
+        monthly_repair_maintenance_cost (array_like, optional): The monthly maintenance cost. Defaults to 0.
+
+    Returns:
+        numpy.ndarray: The monthly amount available for the loan payment.
+    """
+    return (np.asarray(monthly_budget, dtype=np.float64)
+            - np.asarray(monthly_gas_cost, dtype=np.float64)
+            - np.asarray(monthly_repair_maintenance_cost, dtype=np.float64))
+
+
+def solve_max_principal(monthly_payment, annual_rate, years):
+    """
+    Calculate the largest principal a monthly payment can repay, by inverting the loan formula.
+
+    Args:
+        monthly_payment (array_like): The target monthly loan payment.
+        annual_rate (array_like): The annual interest rate.
+        years (array_like): The loan term in years.
+
+    Returns:
+        numpy.ndarray: The maximum principal, broadcast over the inputs. Zero where the payment
+                       is not positive.
+    """
+    monthly_payment, annual_rate, years = np.broadcast_arrays(
+        np.asarray(monthly_payment, dtype=np.float64),
+        np.asarray(annual_rate, dtype=np.float64),
+        np.asarray(years, dtype=np.float64),
+    )
+    monthly_rate = annual_rate / 12
+    n = years * 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.float_power(1 + monthly_rate, n)
+        principal = np.where(monthly_rate == 0, monthly_payment * n,
+                             monthly_payment * (growth - 1) / (monthly_rate * growth))
+    return np.maximum(principal, 0)[()]
+
+
+def solve_max_purchase_price(monthly_budget, annual_rate, years, down_payment_amount=0,
+                             monthly_gas_cost=0, monthly_repair_maintenance_cost=0):
+    """
+    Calculate the most expensive vehicle a total monthly budget can afford.
+
+    Args:
+        monthly_budget (array_like): The total monthly amount the customer can spend.
+        annual_rate (array_like): The annual interest rate.
+        years (array_like): The loan term in years.
+        down_payment_amount (array_like, optional): The down payment. Defaults to 0.
+        monthly_gas_cost (array_like, optional): The monthly gas cost. Defaults to 0.
+        monthly_repair_maintenance_cost (array_like, optional): The monthly maintenance cost. Defaults to 0.
+
+    Returns:
+        numpy.ndarray: The maximum purchase price, broadcast over the inputs.
+    """
+    loan_budget = get_loan_budget(monthly_budget, monthly_gas_cost, monthly_repair_maintenance_cost)
+    return (solve_max_principal(loan_budget, annual_rate, years)
+            + np.asarray(down_payment_amount, dtype=np.float64))[()]
+
+
+def solve_implied_rate(principal, monthly_payment, years, max_rate=1.0, iterations=64):
+    """
+    Find the annual interest rate at which a principal is repaid by a given monthly payment.
+
+    The payment rises with the rate, so the rate is found by bisection on [0, max_rate],
+    evaluating every candidate with calculate_monthly_loan_payments for all loans at once.
+
+    Args:
+        principal (array_like): The principal loan amount.
+        monthly_payment (array_like): The target monthly loan payment.
+        years (array_like): The loan term in years.
+        max_rate (float, optional): The highest annual rate searched. Defaults to 1.0 (100%).
+        iterations (int, optional): Bisection steps; 64 narrows the bracket to float precision.
+
+    Returns:
+        numpy.ndarray: The annual rate, broadcast over the inputs. NaN where the payment is
+                       below the zero-rate payment or above the payment at max_rate.
+    """
+    principal, monthly_payment, years = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(monthly_payment, dtype=np.float64),
+        np.asarray(years, dtype=np.float64),
+    )
+    low = np.zeros(principal.shape)
+    high = np.full(principal.shape, float(max_rate))
+    solvable = ((calculator.calculate_monthly_loan_payments(principal, low, years) <= monthly_payment)
+                & (monthly_payment <= calculator.calculate_monthly_loan_payments(principal, high, years)))
+
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        too_low = calculator.calculate_monthly_loan_payments(principal, middle, years) < monthly_payment
+        low = np.where(too_low, middle, low)
+        high = np.where(too_low, high, middle)
+    return np.where(solvable, (low + high) / 2, np.nan)[()]
+
+
+def solve_min_term(principal, annual_rate, monthly_payment, max_years=30):
+    """
+    Find the shortest whole-year loan term whose monthly payment fits a target payment.
+
+    Args:
+        principal (array_like): The principal loan amount.
+        annual_rate (array_like): The annual interest rate.
+        monthly_payment (array_like): The largest acceptable monthly loan payment.
+        max_years (int, optional): The longest term considered. Defaults to 30.
+
+    Returns:
+        numpy.ndarray: The term in years, broadcast over the inputs. 1 where there is nothing
+                       to borrow. NaN where the payment is not positive, does not even cover
+                       the interest or needs more than max_years.
+    """
+    principal, annual_rate, monthly_payment = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(annual_rate, dtype=np.float64),
+        np.asarray(monthly_payment, dtype=np.float64),
+    )
+    monthly_rate = annual_rate / 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Closed form for the number of months: n = -log(1 - r * P / A) / log(1 + r)
+        months = np.where(monthly_rate == 0, principal / monthly_payment,
+                          -np.log1p(-monthly_rate * principal / monthly_payment) / np.log1p(monthly_rate))
+    years = np.ceil(months / 12)
+    # Nothing to borrow takes the shortest term; a payment of zero or less never pays off a loan
+    years = np.where((monthly_payment > 0) & (years >= 1) & (years <= max_years), years, np.nan)
+    years = np.where(principal <= 0, 1, years)
+
+    # Guard against rounding in the closed form by checking the payment at the found term
+    valid = ~np.isnan(years) & (principal > 0)
+    payments = calculator.calculate_monthly_loan_payments(principal, annual_rate, np.where(valid, years, 1))
+    years = np.where(valid & (payments > monthly_payment), years + 1, years)
+    years = np.where(years <= max_years, years, np.nan)
+    return years[()]
+
+
+def solve_min_term_for_budget(purchase_price, annual_rate, monthly_budget, down_payment_amount=0,
+                              monthly_gas_cost=0, monthly_repair_maintenance_cost=0, max_years=30):
+    """
+    Find the shortest whole-year loan term that keeps the total monthly cost within a budget.
+
+    Args:
+        purchase_price (array_like): The purchase price of the vehicle.
+        annual_rate (array_like): The annual interest rate.
+        monthly_budget (array_like): The total monthly amount the customer can spend.
+        down_payment_amount (array_like, optional): The down payment. Defaults to 0.
+        monthly_gas_cost (array_like, optional): The monthly gas cost. Defaults to 0.
+        monthly_repair_maintenance_cost (array_like, optional): The monthly maintenance cost. Defaults to 0.
+        max_years (int, optional): The longest term considered. Defaults to 30.
+
+    Returns:
+        numpy.ndarray: The term in years, as returned by solve_min_term.
+    """
+    principal = np.asarray(purchase_price, dtype=np.float64) - np.asarray(down_payment_amount, dtype=np.float64)
+    loan_budget = get_loan_budget(monthly_budget, monthly_gas_cost, monthly_repair_maintenance_cost)
+    return solve_min_term(principal, annual_rate, loan_budget, max_years)
+
+
+def solve_implied_rate_for_budget(purchase_price, monthly_budget, years, down_payment_amount=0,
+                                  monthly_gas_cost=0, monthly_repair_maintenance_cost=0, max_rate=1.0):
+    """
+    Find the highest annual interest rate that keeps the total monthly cost within a budget.
+
+    Args:
+        purchase_price (array_like): The purchase price of the vehicle.
+        monthly_budget (array_like): The total monthly amount the customer can spend.
+        years (array_like): The loan term in years.
+        down_payment_amount (array_like, optional): The down payment. Defaults to 0.
+        monthly_gas_cost (array_like, optional): The monthly gas cost. Defaults to 0.
+        monthly_repair_maintenance_cost (array_like, optional): The monthly maintenance cost. Defaults to 0.
+        max_rate (float, optional): The highest annual rate searched. Defaults to 1.0 (100%).
+
+    Returns:
+        numpy.ndarray: The annual rate, as returned by solve_implied_rate.
+    """
+    principal = np.asarray(purchase_price, dtype=np.float64) - np.asarray(down_payment_amount, dtype=np.float64)
+    loan_budget = get_loan_budget(monthly_budget, monthly_gas_cost, monthly_repair_maintenance_cost)
+    return solve_implied_rate(principal, loan_budget, years, max_rate)
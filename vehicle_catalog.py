@@ -0,0 +1,203 @@
+import bisect
+import difflib
+import json
+import threading
+
+from instrumentation import metrics
+
+
+class VehicleCatalog:
+    """
+    An indexed, in-memory view of the vehicle makes, models and mileages in vehicle_details.json.
+
+    The file is read once, on first use, and every lookup after that is served from
+    dictionaries and sorted lists built at load time.
+    """
+    def __init__(self, file_path="vehicle_details.json"):
+        """
+        Initialize the VehicleCatalog class without reading the file yet.
+
+        Args:
+            file_path (str, optional): The JSON file of makes mapped to lists of models, with an
+                                       optional "Mileage" list. Defaults to "vehicle_details.json".
+        """
+        self.file_path = file_path
+        self._details = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Read the catalog file and build the lookup indexes, if that has not happened yet.
+        """
+        if self._details is not None:
+            return
+        with self._lock:
+            if self._details is not None:
+                return
+            with metrics.timer('vehicle_catalog_load_seconds'), open(self.file_path, "r") as json_file:
+                details = json.load(json_file)
+
+            self._makes = [make for make in details.keys() if make != "Mileage"]
+            self._mileages = details.get("Mileage", [])
+            self._make_index = {make: index for index, make in enumerate(self._makes)}
+            self._model_index = {
+                make: {model: index for index, model in enumerate(details[make])} for make in self._makes
+            }
+            self._makes_by_name = {make.lower(): make for make in self._makes}
+            self._models_by_name = {
+                make: {model.lower(): model for model in details[make]} for make in self._makes
+            }
+            # Sorted lowercase "make model" names for prefix search with bisect
+            self._full_names = {f"{make} {model}".lower(): (make, model)
+                                for make in self._makes for model in details[make]}
+            self._sorted_names = sorted(self._full_names)
+            self._details = details
+
+    @property
+    def details(self):
+        """
+        dict: The raw catalog, as read from the file.
+        """
+        self.load()
+        return self._details
+
+    def get_makes(self):
+        """
+        Get every make in the catalog.
+
+        Returns:
+            list: The makes, in file order.
+        """
+        self.load()
+        return self._makes
+
+    def get_models(self, make):
+        """
+        Get every model of a make.
+
+        Args:
+            make (str): The make of the vehicle.
+
+        Returns:
+            list: The models, in file order.
+        """
+        self.load()
+        return self._details[make]
+
+    def get_mileages(self):
+        """
+        Get the mileages listed in the catalog.
+
+        Returns:
+            list: The annual mileages from the "Mileage" entry, or an empty list.
+        """
+        self.load()
+        return self._mileages
+
+    def has_vehicle(self, make, model):
+        """
+        Check whether a make and model are in the catalog.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+
+        Returns:
+            bool: True if the catalog lists the model under the make.
+        """
+        self.load()
+        return model in self._model_index.get(make, {})
+
+    def get_make_index(self, make):
+        """
+        Get the ordinal position of a make.
+
+        Args:
+            make (str): The make of the vehicle.
+
+        Returns:
+            int: The zero-based index of the make, or None if it is not in the catalog.
+        """
+        self.load()
+        return self._make_index.get(make)
+
+    def get_model_index(self, make, model):
+        """
+        Get the ordinal position of a model within its make.
+
+        Args:
+            make (str): The make of the vehicle.
+            model (str): The model of the vehicle.
+
+        Returns:
+            int: The zero-based index of the model, or None if it is not in the catalog.
+        """
+        self.load()
+        return self._model_index.get(make, {}).get(model)
+
+    def find_make(self, name):
+        """
+        Find a make by name, ignoring case.
+
+        Args:
+            name (str): The name to look up.
+
+        Returns:
+            str: The make as spelled in the catalog, or None if there is no match.
+        """
+        self.load()
+        return self._makes_by_name.get(name.strip().lower())
+
+    def find_model(self, make, name):
+        """
+        Find a model of a make by name, ignoring case.
+
+        Args:
+            make (str): The make of the vehicle, as spelled in the catalog.
+            name (str): The name to look up.
+
+        Returns:
+            str: The model as spelled in the catalog, or None if there is no match.
+        """
+        self.load()
+        return self._models_by_name.get(make, {}).get(name.strip().lower())
+
+    def search(self, prefix, limit=10):
+        """
+        Find vehicles whose "make model" name starts with a prefix, ignoring case.
+
+        Args:
+            prefix (str): The start of the name, e.g. "bmw x" or "toy".
+            limit (int, optional): The maximum number of matches. Defaults to 10.
+
+        Returns:
+            list: Tuples of (make, model) in alphabetical order.
+        """
+        self.load()
+        prefix = prefix.strip().lower()
+        names = self._sorted_names
+        matches = []
+        index = bisect.bisect_left(names, prefix)
+        while index < len(names) and len(matches) < limit and names[index].startswith(prefix):
+            matches.append(self._full_names[names[index]])
+            index += 1
+        return matches
+
+    def fuzzy_search(self, query, limit=5, cutoff=0.6):
+        """
+        Find the vehicles whose "make model" name is closest to a possibly misspelled query.
+
+        Args:
+            query (str): The name to match, e.g. "toyta camry".
+            limit (int, optional): The maximum number of matches. Defaults to 5.
+            cutoff (float, optional): Minimum similarity between 0 and 1. Defaults to 0.6.
+
+        Returns:
+            list: Tuples of (make, model), best match first.
+        """
+        self.load()
+        names = difflib.get_close_matches(query.strip().lower(), self._sorted_names, n=limit, cutoff=cutoff)
+        return [self._full_names[name] for name in names]
+
+
+vehicle_catalog = VehicleCatalog()